@@ -0,0 +1,49 @@
+import pandas as pd
+import streamlit as st
+import perf
+import shared_cache
+
+# --- CUBO DE AGREGADOS (UNO POR VERSIÓN DE DATOS) ---
+DIMS = ['Primary Driver', 'Secondary Driver', 'Category', 'REG_GROUP', 'Month']
+MEASURES = ['n', 'n_id', 'score_sum']
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def build_cube(version, _df):
+    # Con caché compartida (shared_cache.py) el cubo de cada versión se calcula en una sola réplica.
+    return shared_cache.frame(f"cube-{version}", lambda: _build_cube(_df))
+
+
+def _build_cube(df):
+    perf.count('build:build_cube')
+    # Claves categóricas (ver data.normalize_survey): el groupby trabaja sobre códigos enteros.
+    keys = {c: df[c] if c in df.columns else pd.Series('N/A', index=df.index) for c in DIMS}
+    values = pd.DataFrame({
+        'n': 1,
+        'n_id': df['Customer ID'].notna().astype(int) if 'Customer ID' in df.columns else 1,
+        'score_sum': df['Score'].astype('float64') if 'Score' in df.columns else 0.0,
+    }, index=df.index)
+    return values.groupby([keys[c].rename(c) for c in DIMS], observed=True, sort=False).sum().reset_index()
+
+
+def slice_cube(cube, filters):
+    # filters: {columna: valor o lista de valores}
+    mask = pd.Series(True, index=cube.index)
+    for col, value in filters.items():
+        if isinstance(value, (list, tuple, set)):
+            mask &= cube[col].isin(value)
+        else:
+            mask &= cube[col] == value
+    return cube[mask]
+
+
+def delivery(cube):
+    # Recorte Delivery de la vista EA/LP (también export.py y el benchmark). .str sobre la columna categórica
+    # opera solo sobre sus categorías distintas.
+    return cube[cube['Primary Driver'].str.strip().str.upper() == 'DELIVERY']
+
+
+def rollup(cube, by):
+    out = cube.groupby(by, observed=True)[MEASURES].sum().reset_index()
+    out['Score'] = out['score_sum'] / out['n']
+    return out
@@ -0,0 +1,63 @@
+import base64
+import os
+import streamlit as st
+
+# --- IMÁGENES ESTÁTICAS (WEBP A TAMAÑO DE PANTALLA, SERVIDAS DESDE ./static) ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+# archivo -> (ancho máx., alto máx.) en píxeles; el doble del tamaño mostrado para pantallas retina
+ASSETS = {
+    'logo3.png': (1920, 1080),  # fondo del home (background-size: cover)
+    'logo.png': (160, 160),     # banners: max-height 80px / 70px
+    'logo2.png': (400, 160),
+}
+QUALITY = 82
+
+
+def _target(name):
+    return os.path.join(STATIC_DIR, os.path.splitext(name)[0] + '.webp')
+
+
+def build_assets(force=False):
+    # Reescala y comprime solo si falta el .webp o la imagen original es más nueva.
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    for name, size in ASSETS.items():
+        src, dst = os.path.join(BASE_DIR, name), _target(name)
+        if not os.path.exists(src):
+            continue
+        if not force and os.path.exists(dst) and os.path.getmtime(dst) >= os.path.getmtime(src):
+            continue
+        from PIL import Image  # solo si hay que regenerar algo
+        with Image.open(src) as im:
+            im.thumbnail(size, Image.LANCZOS)
+            im.save(dst, 'WEBP', quality=QUALITY, method=6)
+
+
+@st.cache_resource(show_spinner=False)
+def _asset_urls():
+    try:
+        build_assets()
+    except Exception:
+        pass
+    serving = st.get_option('server.enableStaticServing')
+    urls = {}
+    for name in ASSETS:
+        webp, src = _target(name), os.path.join(BASE_DIR, name)
+        if serving and os.path.exists(webp):
+            urls[name] = f"app/static/{os.path.basename(webp)}"
+        elif os.path.exists(webp) or os.path.exists(src):
+            # Sin static serving: data URI calculado una sola vez por proceso.
+            path, mime = (webp, 'image/webp') if os.path.exists(webp) else (src, 'image/png')
+            with open(path, 'rb') as f:
+                urls[name] = f"data:{mime};base64,{base64.b64encode(f.read()).decode()}"
+    return urls
+
+
+def asset_url(name):
+    return _asset_urls().get(name)
+
+
+if __name__ == "__main__":
+    build_assets(force=True)
+    for name in ASSETS:
+        print(f"{name}: {os.path.getsize(os.path.join(BASE_DIR, name))} -> {os.path.getsize(_target(name))} bytes")
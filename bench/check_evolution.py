@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import synth  # noqa: E402  (bench/ está en sys.path al ejecutar el script)
+import evolution  # noqa: E402
+
+# --- CHEQUEO DEL PARSER DE EVOLUCIÓN CON LA DISPOSICIÓN HISTÓRICA Y CON LA SINTÉTICA DEL BENCHMARK ---
+# python bench/check_evolution.py  (sale con código 1 si algo no coincide)
+
+
+def check(label, raw, sites, drivers):
+    evo = evolution.parse_evolution(f"check-{label}", raw)
+    errors = []
+    if list(evo['blocks']) != sites:
+        errors.append(f"sitios {list(evo['blocks'])} != {sites}")
+    order = [evolution.site_key(s) for s in evolution.ordered_sites(evo['blocks'])]
+    if order != evolution.SITE_ORDER:
+        errors.append(f"orden {order} != {evolution.SITE_ORDER}")
+    unmapped = [s for s in evo['blocks'] if evolution.site_key(s) not in evolution.SITE_REGIONS]
+    if unmapped:
+        errors.append(f"sitios sin regiones para el historial: {unmapped}")
+    found = [d['driver'] for d in evo['detractors']]
+    if found != drivers:
+        errors.append(f"detractores {found} != {drivers}")
+    for site, block in evo['blocks'].items():
+        if any(pd.isna(v) for v in block['actual'][1][:11] + block['bgt'][1] + block['prior'][1]):
+            errors.append(f"{site}: series incompletas")
+    print(f"{label}: {'OK' if not errors else 'ERROR'}")
+    for e in errors:
+        print(f"  {e}")
+    return not errors
+
+
+def main():
+    legacy = synth.legacy_evolution()
+    current = synth.evolution()
+    ok = check('legacy', legacy, ['NPS CD EL ALTO', 'NPS EA', 'NPS LP'], ['Equipos de frio', 'Entrega', 'Atención vendedor'])
+    ok &= check('synth', current, synth.SITES, [current.iloc[r, 0] for r in range(len(current) - 3, len(current))])
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import nps_engine  # noqa: E402
+
+# --- CHEQUEO DEL INTERVALO NPS CONTRA LA FÓRMULA PUBLICADA (WALD AJUSTADO, ROCKS 2016) ---
+# python bench/check_nps.py  (sale con código 1 si algo no coincide)
+# Referencia: 50 promotores, 20 detractores, 30 pasivos -> n' = 103, p' = 50.75/103, d' = 20.75/103,
+# NPS' = p' - d', var = (p' + d' - NPS'^2) / n', IC = NPS' ± 1.96·sqrt(var) = [14.05, 44.20].
+CASES = [(50, 20, 100, (14.05, 44.20))]
+
+
+def reference(promoters, detractors, n, z=nps_engine.Z):
+    n_adj = n + 3
+    p, d = (promoters + .75) / n_adj, (detractors + .75) / n_adj
+    se = math.sqrt((p + d - (p - d) ** 2) / n_adj)
+    return 100 * (p - d - z * se), 100 * (p - d + z * se)
+
+
+def main():
+    ok = True
+    for promoters, detractors, n, expected in CASES:
+        lo, hi = (float(v) for v in nps_engine.nps_interval(promoters, detractors, n))
+        ref = reference(promoters, detractors, n)
+        good = all(abs(a - b) < 1e-9 for a, b in zip((lo, hi), ref)) and \
+            all(abs(a - b) < .01 for a, b in zip((lo, hi), expected))
+        print(f"p={promoters} d={detractors} n={n}: [{lo:.2f}, {hi:.2f}] esperado [{expected[0]:.2f}, {expected[1]:.2f}] "
+              f"{'OK' if good else 'ERROR'}")
+        ok &= good
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+import argparse
+import hashlib
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import synth  # noqa: E402  (bench/ está en sys.path al ejecutar el script)
+
+# --- BENCHMARK OFFLINE: HOJAS SINTÉTICAS SERVIDAS POR UN EXPORT LOCAL, VISTAS SIN NAVEGADOR ---
+# python bench/run.py --sizes 1k,100k,1M --repeat 3
+SIZES = {'1k': 1_000, '10k': 10_000, '100k': 100_000, '1M': 1_000_000}
+DEFAULT_CATS = ('Detractor', 'Passive', 'Promoter')
+
+
+class ExportServer:
+    # Imita /spreadsheets/d/<id>/export?format=csv con ETag y 304, como Google.
+    def __init__(self):
+        self.sheets, self.bytes_sent, self.requests = {}, 0, 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                name = self.path.split('/d/')[-1].split('/')[0]
+                body = server.sheets.get(name)
+                server.requests += 1
+                if body is None:
+                    self.send_error(404)
+                    return
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/csv; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+                server.bytes_sent += len(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:%d' % self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def sheet_url(self, name):
+        return f"{self.url}/spreadsheets/d/{name}/edit"
+
+
+server = ExportServer()
+os.environ['NPS_SHEET_URL_CURRENT'] = server.sheet_url('current')
+os.environ['NPS_SHEET_URL_MAP'] = server.sheet_url('coords')
+os.environ['NPS_SHEET_URL_EVO'] = server.sheet_url('evolution')
+# Siempre un directorio temporal propio: clear_caches() lo borra entero (nunca el store real heredado del entorno).
+os.environ['NPS_SNAPSHOT_DIR'] = tempfile.mkdtemp(prefix='nps-bench-')
+logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+import aggregates  # noqa: E402  (las URLs se leen al importar data)
+import charts  # noqa: E402
+import comments  # noqa: E402
+import data  # noqa: E402
+import evolution  # noqa: E402
+import geo  # noqa: E402
+import history  # noqa: E402
+import nps_engine  # noqa: E402
+import store  # noqa: E402
+
+
+# --- RUTAS DE CADA VISTA (MISMO ORDEN Y ARGUMENTOS QUE app.py) ---
+def view_dashboard(t):
+    df, df_coords = t('fetch', lambda: data.get_datasets('current', 'coords'))
+    version, coords_version = data.dataset_version('current'), data.dataset_version('coords')
+    cube = t('aggregate', lambda: aggregates.build_cube(version, df))
+    segments = t('nps_engine', lambda: nps_engine.build_segments(version, cube))
+    figs = t('figures', lambda: [
+        charts.fig_primary_composition(version, cube),
+        charts.fig_primary_score(version, cube),
+        charts.fig_category_composition(version, 'All', DEFAULT_CATS, cube),
+        charts.fig_secondary_volume(version, 'All', DEFAULT_CATS, cube),
+        charts.fig_secondary_score(version, 'All', DEFAULT_CATS, cube),
+        charts.fig_nps_ci(version, 'All', segments),
+    ])
+    t('comment_index', lambda: comments.build_comment_index(version, df))
+    geo_idx = t('geo_index', lambda: geo.build_geo_index(version, coords_version, df, df_coords))
+    figs.append(t('map', lambda: charts.fig_heatmap((version, coords_version), 'All', DEFAULT_CATS, '', geo_idx)))
+    return figs
+
+
+def view_monthly(t):
+    raw = t('fetch', lambda: data.get_dataset('evolution'))
+    version = data.dataset_version('evolution')
+    evo, version = t('parse', lambda: history.monthly_evolution(version, raw))
+    return t('figures', lambda: [f for site, block in evo['blocks'].items()
+                                 for f in (charts.fig_nps_line(version, site, block), charts.fig_nps_ytd(version, site, block))] +
+             [charts.fig_detractor_ring(version, d['driver'], d['ytd']) for d in evo['detractors'][:3]])
+
+
+def view_ea_lp(t):
+    df = t('fetch', lambda: data.get_dataset('current'))
+    version = data.dataset_version('current')
+    cube = t('aggregate', lambda: aggregates.build_cube(version, df))
+    # Como la vista: opciones de categoría del recorte Delivery, todas seleccionadas.
+    delivery = t('slice', lambda: aggregates.delivery(cube))
+    cats = tuple(sorted(c for c in delivery['Category'].unique() if str(c) not in ['nan', 'N/A']))
+    df_final = t('slice', lambda: aggregates.slice_cube(delivery, {'REG_GROUP': ['EA', 'LP'], 'Category': list(cats)}))
+    return t('figures', lambda: [
+        charts.fig_region_distribution(version, cats, df_final),
+        charts.fig_drivers_by_region(version, cats, df_final),
+        charts.fig_score_gap(version, cats, df_final),
+    ])
+
+
+VIEWS = {'dashboard': view_dashboard, 'monthly': view_monthly, 'ea_lp': view_ea_lp}
+
+
+def clear_caches():
+    # Arranque en frío: sin snapshots ni registro de hojas, sin cubo/índice/parseo cacheados y sin figuras.
+    shutil.rmtree(store.SNAPSHOT_DIR, ignore_errors=True)
+    data._entries.clear()
+    for fn in (aggregates.build_cube, geo.build_geo_index, evolution.parse_evolution, nps_engine.build_segments,
+               comments.build_comment_index, history.load_range, evolution.from_history):
+        fn.clear()
+    with charts._figures_lock:
+        charts._figures.clear()
+
+
+def run_view(fn):
+    stages = {}
+
+    def timed(stage, thunk):
+        start = time.perf_counter()
+        out = thunk()
+        stages[stage] = stages.get(stage, 0) + time.perf_counter() - start
+        return out
+    start = time.perf_counter()
+    figs = fn(timed)
+    stages['total'] = time.perf_counter() - start
+    return stages, figs
+
+
+def bench_size(label, n, views, repeat):
+    server.sheets = synth.sheets(n)
+    rows = []
+    for view in views:
+        cold, warm = [], []
+        for _ in range(repeat):
+            clear_caches()
+            cold.append(run_view(VIEWS[view])[0])
+            warm.append(run_view(VIEWS[view])[0])  # segunda sesión: todo desde caché
+        clear_caches()
+        tracemalloc.start()
+        _, figs = run_view(VIEWS[view])
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        payload = sum(len(f.to_json()) for f in figs if f is not None)
+        for stage in cold[0]:
+            rows.append((label, view, stage, min(c[stage] for c in cold) * 1000, min(w.get(stage, 0) for w in warm) * 1000))
+        rows.append((label, view, 'peak_mem_MB', peak / 2 ** 20, None))
+        rows.append((label, view, 'payload_KB', payload / 1024, None))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark offline de las vistas del tablero NPS.')
+    parser.add_argument('--sizes', default='1k,100k,1M', help='filas de la encuesta: ' + ','.join(SIZES))
+    parser.add_argument('--views', default=','.join(VIEWS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--out', default=os.path.join(ROOT, 'bench_output.txt'))
+    args = parser.parse_args(argv)
+    lines = ['%-5s %-10s %-12s %12s %12s' % ('size', 'view', 'stage', 'cold (ms)', 'warm (ms)')]
+    print(lines[0], flush=True)
+    for label in args.sizes.split(','):
+        for row in bench_size(label, SIZES[label], args.views.split(','), args.repeat):
+            lines.append('%-5s %-10s %-12s %12.1f %12s' % (row[:4] + ('' if row[4] is None else '%.1f' % row[4],)))
+            print(lines[-1], flush=True)
+        lines.append('%-5s %-10s %-12s %12.1f' % (label, 'http', 'sent_MB', server.bytes_sent / 2 ** 20))
+        print(lines[-1], flush=True)
+        server.bytes_sent = 0
+    with open(args.out, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+if __name__ == '__main__':
+    main()
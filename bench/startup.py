@@ -0,0 +1,69 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from run import ROOT, server  # noqa: E402  (levanta el export local y apunta NPS_SHEET_URL_* a él)
+import synth  # noqa: E402
+
+# --- ARRANQUE EN FRÍO: IMPORTS + PRIMER RENDER DE CADA PÁGINA, CADA MEDICIÓN EN UN PROCESO NUEVO ---
+# python bench/startup.py --repeat 5
+# first_ms = primer run del script (incluye importar app.py y lo que use la página); rerun_ms = segundo run en el
+# mismo proceso. "heavy" = librerías pesadas ya cargadas al terminar el primer render. Cada página se mide con el
+# refresco en segundo plano activo (sched=on, como arranca la app) y con NPS_SCHEDULER=0 (sched=off).
+PAGES = ['home', 'dashboard', 'monthly', 'ea_lp']
+HEAVY = ['pandas', 'numpy', 'pyarrow', 'plotly.express', 'plotly.graph_objects', 'requests', 'PIL.Image']
+CHILD = r'''
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.session_state.page = sys.argv[2]
+at.run()
+t2 = time.perf_counter()
+at.run()
+t3 = time.perf_counter()
+print(json.dumps({'streamlit_ms': (t1 - t0) * 1000, 'first_ms': (t2 - t1) * 1000, 'rerun_ms': (t3 - t2) * 1000,
+                  'errors': [str(e.value) for e in at.exception], 'heavy': [m for m in sys.argv[3:] if m in sys.modules]}))
+'''
+
+
+def measure(page, env):
+    out = subprocess.run([sys.executable, '-c', CHILD, os.path.join(ROOT, 'app.py'), page] + HEAVY,
+                         env=env, cwd=ROOT, capture_output=True, text=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Tiempo de arranque y de primer render por página.')
+    parser.add_argument('--pages', default=','.join(PAGES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scheduler', default='on,off', help='on (por defecto en la app), off o ambos: on,off')
+    parser.add_argument('--out', default=os.path.join(ROOT, 'bench_startup.txt'))
+    args = parser.parse_args(argv)
+    server.sheets = synth.sheets(1_000)
+    lines = ['%-10s %-5s %10s %10s %10s  %s' % ('page', 'sched', 'first (ms)', 'rerun (ms)', 'st (ms)', 'heavy modules loaded')]
+    print(lines[0], flush=True)
+    for page in args.pages.split(','):
+        for sched in args.scheduler.split(','):
+            runs = []
+            for _ in range(args.repeat):
+                # Snapshots vacíos en cada proceso: el primer render de una vista incluye la descarga.
+                env = dict(os.environ, NPS_SNAPSHOT_DIR=tempfile.mkdtemp(prefix='nps-startup-'),
+                           NPS_SCHEDULER='0' if sched == 'off' else '1')
+                runs.append(measure(page, env))
+            errors = sorted({e for r in runs for e in r['errors']})
+            lines.append('%-10s %-5s %10.0f %10.0f %10.0f  %s' % (
+                page, sched, *(statistics.median(r[k] for r in runs) for k in ('first_ms', 'rerun_ms', 'streamlit_ms')),
+                ','.join(runs[-1]['heavy']) or '-') + (f"  ERRORES: {errors}" if errors else ''))
+            print(lines[-1], flush=True)
+    with open(args.out, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+if __name__ == '__main__':
+    main()
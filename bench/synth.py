@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+# --- GENERADOR SINTÉTICO CON EL ESQUEMA REAL DE LAS HOJAS ---
+DRIVERS = {
+    'Delivery': ['Late delivery', 'Incomplete order', 'Driver attitude', 'Wrong products', 'Delivery schedule'],
+    'Payment and Credit': ['Payment methods', 'Credit limit', 'Invoice errors'],
+    'Refrigeration and Materials': ['Cooler broken', 'POP materials', 'Cooler request'],
+    'Sales Rep': ['Visit frequency', 'Promotions', 'Rep attitude'],
+    'Product': ['Product availability', 'Price', 'Quality'],
+}
+REGIONS = ['EL ALTO NORTE', 'EL ALTO SUR', 'LA PAZ CENTRO', 'LA PAZ SUR', 'ORURO', 'POTOSI']
+WORDS = ['el', 'camión', 'llegó', 'tarde', 'buen', 'servicio', 'atención', 'pésima', 'precio', 'producto',
+         'entrega', 'incompleta', 'vendedor', 'amable', 'heladera', 'rota', 'crédito', 'promoción', 'siempre', 'nunca']
+MESES = ["ENE", "FEB", "MAR", "ABR", "MAY", "JUN", "JUL", "AGO", "SEP", "OCT", "NOV", "DIC"]
+SITES = ['CD EL ALTO', 'EA', 'LP']
+
+
+def survey(n, seed=0, year=2025):
+    rng = np.random.default_rng(seed)
+    pairs = [(p, s) for p, subs in DRIVERS.items() for s in subs]
+    pick = rng.integers(0, len(pairs), n)
+    primary = np.array([p for p, _ in pairs], dtype=object)[pick]
+    secondary = np.array([s for _, s in pairs], dtype=object)[pick]
+    score = rng.choice(11, n, p=[.03, .02, .02, .03, .04, .06, .08, .12, .18, .2, .22])
+    category = np.where(score >= 9, 'Promoter', np.where(score >= 7, 'Passive', 'Detractor'))
+    # Los promotores suelen no elegir driver: la hoja los trae vacíos.
+    primary[(category == 'Promoter') & (rng.random(n) < .5)] = None
+    ids = rng.integers(10_000_000, 10_000_000 + max(n // 2, 10), n)
+    dates = pd.Timestamp(f'{year}-01-01') + pd.to_timedelta(rng.integers(0, 365 * 86400, n), unit='s')
+    words = np.array(WORDS, dtype=object)
+    comments = words[rng.integers(0, len(words), n)] + ' ' + words[rng.integers(0, len(words), n)] + ' ' + \
+        words[rng.integers(0, len(words), n)]
+    comments[rng.random(n) < .3] = None
+    return pd.DataFrame({
+        'Customer ID': ids,
+        'Sales Region': np.array(REGIONS, dtype=object)[rng.integers(0, len(REGIONS), n)],
+        'Score': score,
+        'Category': category,
+        'Survey Completed Date': dates.strftime('%Y-%m-%d %H:%M:%S'),
+        'Primary Driver': primary,
+        'Secondary Driver': secondary,
+        'Comment (Native language)': comments,
+    })
+
+
+def coords(ids, seed=0):
+    # Una fila por cliente alrededor de La Paz / El Alto.
+    rng = np.random.default_rng(seed)
+    ids = np.unique(ids)
+    return pd.DataFrame({'Codigo': ids, 'Longitud': -68.15 + rng.normal(0, .06, len(ids)),
+                         'Latitud': -16.5 + rng.normal(0, .05, len(ids))})
+
+
+def evolution(n_detractors=3, seed=0, last_month=11):
+    # Misma disposición que la hoja real: bloques real/BGT/año anterior por sitio y luego los detractores.
+    rng = np.random.default_rng(seed)
+    rows = [['NPS', None, 'YTD'] + MESES]
+    for site in SITES:
+        rows.append([site] + [None] * 14)
+        for label in ['2025', 'BGT', '2024']:
+            values = list(rng.integers(20, 70, 12))
+            if label == '2025':
+                values[last_month:] = [None] * (12 - last_month)
+            rows.append([None, label, int(rng.integers(30, 60))] + values)
+        rows.append([None] * 15)
+    rows.append(['DETRACTORS'] + [None] * 14)
+    subs = [s for v in DRIVERS.values() for s in v]
+    for i in range(n_detractors):
+        name = subs[i % len(subs)] + ('' if i < len(subs) else f' {i // len(subs)}')
+        rows.append([name, None, int(rng.integers(1, 40))] + [int(v) for v in rng.integers(0, 30, last_month)] +
+                    [None] * (12 - last_month))
+    return pd.DataFrame(rows)
+
+
+def legacy_evolution(seed=0, last_month=11):
+    # Disposición histórica de la hoja real: bloques en las filas 2/7/11 con el nombre 'NPS <sitio>' encima y
+    # drivers detractores en 18/20/22, cada uno con una subfila '%' debajo.
+    rng = np.random.default_rng(seed)
+    rows = [[None] * 15 for _ in range(24)]
+    rows[0] = ['NPS', None, 'YTD'] + MESES
+    for start, site in [(2, 'CD EL ALTO'), (7, 'EA'), (11, 'LP')]:
+        rows[start - 1][0] = f'NPS {site}'
+        for k, label in enumerate(['2025', 'BU', '2024']):
+            values = [int(v) for v in rng.integers(20, 70, 12)]
+            if label == '2025':
+                values[last_month:] = [None] * (12 - last_month)
+            rows[start + k] = [None, label, int(rng.integers(30, 60))] + values
+    rows[17][0] = 'DETRACTORS'
+    for r, name in zip([18, 20, 22], ['Equipos de frio', 'Entrega', 'Atención vendedor']):
+        counts = [int(v) for v in rng.integers(0, 30, last_month)]
+        rows[r] = [name, None, sum(counts)] + counts + [None] * (12 - last_month)
+        rows[r + 1] = ['%', None, round(100 * rng.random(), 1)] + [round(100 * v, 1) for v in rng.random(last_month)] + \
+            [None] * (12 - last_month)
+    return pd.DataFrame(rows)
+
+
+def sheets(n, seed=0):
+    # Textos CSV tal como los devuelve el export de Google Sheets.
+    df = survey(n, seed)
+    return {
+        'current': df.to_csv(index=False).encode(),
+        'coords': coords(df['Customer ID'].to_numpy(), seed).to_csv(index=False).encode(),
+        'evolution': evolution(max(3, n // 1000), seed).to_csv(index=False, header=False).encode(),
+    }
@@ -0,0 +1,356 @@
+import functools
+import inspect
+import textwrap
+import threading
+from collections import OrderedDict
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+import aggregates
+import evolution
+import geo
+import nps_engine
+import perf
+
+# --- CACHÉ LRU DE FIGURAS (COMPARTIDA ENTRE SESIONES DEL PROCESO) ---
+# Clave = (builder, versión de datos, filtros); los argumentos que empiezan con '_' son los datos y no entran en la clave.
+# Las figuras cacheadas se tratan como inmutables: st.plotly_chart solo las lee (to_dict).
+MAX_FIGURES = 256
+_figures = OrderedDict()
+_figures_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def memo_figure(fn):
+    names = list(inspect.signature(fn).parameters)
+
+    @functools.wraps(fn)
+    def wrapper(*args):
+        key = (fn.__name__,) + tuple(a for n, a in zip(names, args) if not n.startswith('_'))
+        with _figures_lock:
+            if key in _figures:
+                _figures.move_to_end(key)
+                _stats['hits'] += 1
+                return _figures[key]
+            _stats['misses'] += 1
+        with perf.timer('charts', fn.__name__):
+            fig = fn(*args)
+        with _figures_lock:
+            _figures[key] = fig
+            while len(_figures) > MAX_FIGURES:
+                _figures.popitem(last=False)
+        return fig
+    return wrapper
+
+
+def cache_stats():
+    with _figures_lock:
+        return dict(_stats, size=len(_figures))
+
+
+FONT_MAIN = dict(color="white", size=22)
+FONT_AXES = dict(color="white", size=14)
+
+
+def _filtrar(cube, driver, cats):
+    filtros = {'Category': list(cats)}
+    if driver != 'All': filtros['Primary Driver'] = driver
+    return aggregates.slice_cube(cube, filtros)
+
+
+# ==========================================
+# DASHBOARD (CURRENT MONTH)
+# ==========================================
+def _primary(cube):
+    return aggregates.rollup(cube[cube['Primary Driver'] != 'N/A'], 'Primary Driver')
+
+
+@memo_figure
+def fig_primary_composition(version, _cube):
+    data_anillo = _primary(_cube)[['Primary Driver', 'n_id']].rename(columns={'n_id': 'Customer ID'})
+    fig1 = px.pie(data_anillo, values='Customer ID', names='Primary Driver', hole=0.6, color_discrete_sequence=['#FFFF00', '#FFD700', '#FFEA00'])
+    fig1.update_layout(title={'text': "1. Primary Driver Composition", 'x': 0.5, 'xanchor': 'center', 'font': FONT_MAIN}, paper_bgcolor='rgba(0,0,0,0)', legend=dict(font=dict(color="white", size=14)), font=dict(color="white"), height=400)
+    return fig1
+
+
+@memo_figure
+def fig_primary_score(version, _cube):
+    data_lineas = _primary(_cube)[['Primary Driver', 'Score']].sort_values(by='Score', ascending=False)
+    fig2 = px.line(data_lineas, x='Primary Driver', y='Score', markers=True)
+    fig2.update_traces(line_color='#FFD700', marker=dict(size=10, color='#FFD700'), text=data_lineas['Score'].map('{:.2f}'.format), textposition="top center", mode='markers+lines+text', textfont=dict(color="white", size=14))
+    fig2.update_layout(title={'text': "2. Average Score Per Primary Driver", 'x': 0.5, 'xanchor': 'center', 'font': FONT_MAIN}, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', xaxis=dict(title=None, tickfont=FONT_AXES, gridcolor='#333333'), yaxis=dict(title=None, tickfont=FONT_AXES, gridcolor='#333333'), font=dict(color="white") )
+    return fig2
+
+
+@memo_figure
+def fig_category_composition(version, driver, cats, _cube):
+    cube_filt3 = _filtrar(_cube, driver, cats)
+    df_visual_cat = aggregates.rollup(cube_filt3[cube_filt3['Category'] != 'N/A'], 'Category')
+    if df_visual_cat.empty:
+        return None
+    conteo_cat = df_visual_cat.set_index('Category')['n'] / df_visual_cat['n'].sum() * 100
+    orden = ['Detractor', 'Passive', 'Promoter']
+    color_map = {'Detractor': '#E74C3C', 'Passive': '#BDC3C7', 'Promoter': '#F1C40F'}
+    fig3 = go.Figure()
+    for cat in orden:
+        val = conteo_cat.get(cat, 0)
+        fig3.add_trace(go.Bar(name=cat, x=['Composition %'], y=[val], marker_color=color_map[cat], text=f"{val:.1f}%" if val > 0 else "", textfont=dict(color="white")))
+    fig3.update_layout(title={'text':"3. Category Composition", 'x':0.5, 'xanchor': 'center', 'font': FONT_MAIN}, barmode='stack', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', xaxis=dict(tickfont=FONT_AXES), legend=dict(font=dict(color="white", size=12)), font=dict(color="white"), height=450)
+    return fig3
+
+
+@memo_figure
+def fig_secondary_volume(version, driver, cats, _cube):
+    cube_filt3 = _filtrar(_cube, driver, cats)
+    if cube_filt3.empty:
+        return None
+    data_vol = aggregates.rollup(cube_filt3, 'Secondary Driver').rename(columns={'n': 'count'}).sort_values(by='count', ascending=True)
+    fig4 = px.bar(data_vol, x='count', y='Secondary Driver', orientation='h', text_auto=True)
+    fig4.update_traces(marker_color='#FFEA00', textfont=dict(color="black", size=14))
+    fig4.update_layout(title={'text':"4. Volume by Secondary Driver", 'x':0.5, 'xanchor': 'center', 'font': FONT_MAIN}, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', xaxis=dict(visible=False), yaxis=dict(title=None, tickfont=FONT_AXES), font=dict(color="white"), height=450)
+    return fig4
+
+
+@memo_figure
+def fig_secondary_score(version, driver, cats, _cube):
+    cube_filt3 = _filtrar(_cube, driver, cats)
+    if cube_filt3.empty:
+        return None
+    data_score = aggregates.rollup(cube_filt3, 'Secondary Driver')[['Secondary Driver', 'Score']].sort_values(by='Score', ascending=False)
+    data_score['Label'] = data_score['Secondary Driver'].apply(lambda x: "<br>".join(textwrap.wrap(str(x), width=15)))
+    labels, scores = data_score['Label'].tolist(), data_score['Score'].to_numpy()
+    n = len(labels)
+    marco = dict(color='rgba(255,255,255,0.05)', line=dict(color='rgba(255,255,255,0.4)', width=1.5))
+    # Una traza por capa del "vaso" (base, cuello, punta, tapa) y por tramo de relleno, con arrays para todos los drivers.
+    fig5 = go.Figure([
+        go.Bar(x=labels, y=np.full(n, 6), marker=marco, width=0.6, showlegend=False, hoverinfo='skip'),
+        go.Bar(x=labels, y=np.full(n, 1.5), base=6, marker=marco, width=0.4, showlegend=False, hoverinfo='skip'),
+        go.Bar(x=labels, y=np.full(n, 2.5), base=7.5, marker=marco, width=0.2, showlegend=False, hoverinfo='skip'),
+        go.Bar(x=labels, y=np.full(n, 0.2), base=10, marker=dict(color='#888'), width=0.25, showlegend=False, hoverinfo='skip'),
+        go.Bar(x=labels, y=np.clip(scores, 0, 6), marker=dict(color='#FFCC00'), width=0.6, showlegend=False),
+        go.Bar(x=labels, y=np.clip(scores - 6, 0, 1.5), base=6, marker=dict(color='#FFCC00'), width=0.4, showlegend=False),
+        go.Bar(x=labels, y=np.clip(scores - 7.5, 0, 2.5), base=7.5, marker=dict(color='#FFCC00'), width=0.2, showlegend=False),
+        go.Scatter(x=labels, y=np.full(n, 10.5), mode='text', text=[f"<b>{s:.2f}</b>" for s in scores], textfont=dict(color="white", size=15), showlegend=False, hoverinfo='skip'),
+    ])
+    fig5.update_layout(title={'text': "5. Avg Score by Secondary Driver", 'x': 0.5, 'xanchor': 'center', 'font': FONT_MAIN}, barmode='overlay', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', xaxis=dict(title=None, tickfont=FONT_AXES, showgrid=False), yaxis=dict(visible=False, range=[0, 12]), height=650, margin=dict(b=100))
+    return fig5
+
+
+@memo_figure
+def fig_nps_ci(version, driver, _segments):
+    # NPS con intervalo de confianza del 95 %: barras de error anchas = pocas respuestas, no sobre-reaccionar.
+    by = 'Primary Driver' if driver == 'All' else 'Secondary Driver'
+    segs = _segments[_segments['Primary Driver'] != 'N/A'] if driver == 'All' else _segments
+    data_nps = nps_engine.rollup(segs, by, None if driver == 'All' else {'Primary Driver': driver})
+    if data_nps.empty:
+        return None
+    data_nps = data_nps.sort_values(by='nps', ascending=True)
+    nps, lo, hi = (data_nps[c].to_numpy() for c in ('nps', 'nps_lo', 'nps_hi'))
+    fig6 = go.Figure(go.Scatter(
+        x=nps, y=data_nps[by].astype(str), mode='markers+text', text=[f"<b>{v:.0f}</b>" for v in nps],
+        textposition='top center', textfont=dict(color="white", size=13),
+        marker=dict(color='#FFFF00', size=12, line=dict(color='black', width=1)),
+        error_x=dict(type='data', symmetric=False, array=hi - nps, arrayminus=nps - lo, color='#FFD700', thickness=2, width=6),
+        customdata=np.column_stack([lo, hi, data_nps['n']]),
+        hovertemplate="%{y}<br>NPS %{x:.1f} [%{customdata[0]:.1f}, %{customdata[1]:.1f}]<br>n = %{customdata[2]}<extra></extra>"))
+    fig6.update_layout(title={'text': "6. NPS by Driver (95% CI)", 'x': 0.5, 'xanchor': 'center', 'font': FONT_MAIN}, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+                       xaxis=dict(title=None, tickfont=FONT_AXES, gridcolor='#333333', zeroline=True, zerolinecolor='#666666', range=[-105, 105]),
+                       yaxis=dict(title=None, tickfont=FONT_AXES), font=dict(color="white"), height=max(400, len(data_nps) * 45), showlegend=False)
+    return fig6
+
+
+def fig_heatmap(version, driver, cats, busqueda, _geo_idx):
+    # Solo se memoiza el mapa sin búsqueda: cada ID parcial tecleado llenaría el LRU compartido y desalojaría las
+    # figuras pre-calentadas. Con el índice geo la búsqueda es barata y se dibuja sin caché.
+    if not busqueda:
+        return _fig_heatmap_all(version, driver, cats, _geo_idx)
+    with perf.timer('charts', 'fig_heatmap_search'):
+        return _heatmap(driver, cats, busqueda, _geo_idx)
+
+
+@memo_figure
+def _fig_heatmap_all(version, driver, cats, _geo_idx):
+    return _heatmap(driver, cats, '', _geo_idx)
+
+
+def _heatmap(driver, cats, busqueda, geo_idx):
+    df_map = geo_idx.search(busqueda) if busqueda else geo_idx.frame
+    if driver != 'All': df_map = df_map[df_map['Primary Driver'] == driver]
+    df_map = df_map[df_map['Category'].isin(cats)]
+    if df_map.empty:
+        return None
+    # Solo se envían puntos crudos al buscar un cliente concreto; si no, celdas agregadas.
+    if busqueda and df_map['Customer ID'].nunique() == 1:
+        df_plot_map, z_col, hover = df_map, 'Score', dict(hover_name='Customer ID')
+    else:
+        df_plot_map, z_col = geo.bin_points(df_map), 'score_sum'
+        hover = dict(hover_data={'Score': ':.2f', 'Clientes': True, 'score_sum': False, 'Lat': False, 'Lon': False})
+    fig_map = px.density_mapbox(
+        df_plot_map, lat='Lat', lon='Lon', z=z_col, radius=20,
+        center=dict(lat=df_map['Lat'].mean(), lon=df_map['Lon'].mean()),
+        zoom=geo.MAP_ZOOM, mapbox_style="open-street-map",
+        color_continuous_scale=[[0, 'rgba(255,0,0,0)'], [0.1, 'rgba(255,0,0,0.5)'], [1, 'rgba(255,0,0,1)']],
+        **hover
+    )
+    fig_map.update_layout(height=600, margin=dict(t=0, b=0, l=0, r=0), paper_bgcolor='rgba(0,0,0,0)', coloraxis_showscale=False)
+    return fig_map
+
+
+# ==========================================
+# MONTHLY EVOLUTION
+# ==========================================
+@memo_figure
+def fig_nps_line(version, site, _block):
+    meses = evolution.MESES
+    (label_25, y25_m, _), (label_bu, bu_m, _), (label_24, y24_m, _) = _block['actual'], _block['bgt'], _block['prior']
+    fig_l = go.Figure()
+    # Etiquetas 1 punto más pequeñas (size 12)
+    fig_l.add_trace(go.Scatter(x=meses, y=y25_m, mode='markers+lines+text', name=label_25, line=dict(color='#FFFF00', width=4), text=y25_m, textposition="top center", textfont=dict(color="white", size=12, family="Arial Black")))
+    fig_l.add_trace(go.Scatter(x=meses, y=bu_m, mode='lines', name=label_bu, line=dict(color='#FFD700', width=2, dash='dash')))
+    fig_l.add_trace(go.Scatter(x=meses, y=y24_m, mode='markers+lines+text', name=label_24, line=dict(color='#F4D03F', width=2), text=y24_m, textposition="bottom center", textfont=dict(color="white", size=11, family="Arial Black")))
+
+    fig_l.update_layout(
+        paper_bgcolor='black', plot_bgcolor='black', font=dict(color="white", size=10),
+        xaxis=dict(showgrid=False, tickfont=dict(color="white", size=11)),
+        yaxis=dict(visible=False, autorange=True),
+        legend=dict(orientation="h", y=1.05, x=0.5, xanchor="center", font=dict(color="white", size=11)),
+        height=320, margin=dict(t=30, b=30, l=10, r=10)
+    )
+    return fig_l
+
+
+@memo_figure
+def fig_nps_ytd(version, site, _block):
+    (label_25, _, val_ytd_25), (label_bu, _, val_ytd_bu), (label_24, _, val_ytd_24) = _block['actual'], _block['bgt'], _block['prior']
+    fig_b = go.Figure()
+    # Etiquetas de barras más grandes (size 17)
+    fig_b.add_trace(go.Bar(x=[label_24, label_bu, label_25], y=[val_ytd_24, val_ytd_bu, val_ytd_25], text=[f"{val_ytd_24}", f"{val_ytd_bu}", f"{val_ytd_25}"], textposition='auto', marker_color=['#F4D03F', '#FFD700', '#FFFF00'], width=0.6, textfont=dict(color="black", size=17, family="Arial Black")))
+    y_t = max(val_ytd_25, val_ytd_bu, val_ytd_24) + 15
+    p25, p24 = ((val_ytd_25 / val_ytd_bu) - 1) * 100 if val_ytd_bu else 0, ((val_ytd_24 / val_ytd_bu) - 1) * 100 if val_ytd_bu else 0
+    fig_b.add_shape(type="path", path=f"M 1,{val_ytd_bu} L 1,{y_t} L 2,{y_t} L 2,{val_ytd_25}", line=dict(color="white", width=2))
+    fig_b.add_shape(type="path", path=f"M 1,{val_ytd_bu} L 1,{y_t} L 0,{y_t} L 0,{val_ytd_24}", line=dict(color="white", width=2))
+
+    # Indicadores más grandes (size 14)
+    fig_b.add_annotation(x=1.5, y=y_t, text=f"<b>{p25:+.1f}%</b>", showarrow=False, bgcolor="#00FF00" if p25 >= 0 else "#FF0000", font=dict(color="black", size=14), bordercolor="white", borderpad=4)
+    fig_b.add_annotation(x=0.5, y=y_t, text=f"<b>{p24:+.1f}%</b>", showarrow=False, bgcolor="#00FF00" if p24 >= 0 else "#FF0000", font=dict(color="black", size=14), bordercolor="white", borderpad=4)
+
+    fig_b.update_layout(
+        paper_bgcolor='black', plot_bgcolor='black', xaxis=dict(showgrid=False, tickfont=dict(color="white", size=11)),
+        yaxis=dict(visible=False, autorange=True), height=320, margin=dict(t=30, b=30, l=10, r=10)
+    )
+    return fig_b
+
+
+@memo_figure
+def fig_detractor_ring(version, driver, _ytd):
+    palabras = driver.split()
+    mitad = len(palabras) // 2
+    txt_form = "<br>".join([" ".join(palabras[:mitad]), " ".join(palabras[mitad:])])
+    fig_ring = go.Figure(go.Pie(values=[1], hole=0.8, marker=dict(colors=['rgba(0,0,0,0)'], line=dict(color='#FFFF00', width=6)), showlegend=False, hoverinfo='none'))
+    fig_ring.add_annotation(text=f"<b>{_ytd}</b>", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=55, family="Arial Black"))
+    fig_ring.add_annotation(text=f"<b>{txt_form}</b>", x=0.5, y=-0.15, showarrow=False, font=dict(color="white", size=16), align='center', xref="paper", yref="paper")
+    fig_ring.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', margin=dict(t=0, b=40, l=10, r=10), height=280)
+    return fig_ring
+
+
+# ==========================================
+# EA / LP
+# ==========================================
+@memo_figure
+def fig_region_distribution(version, cats, _cube):
+    df_plot = aggregates.rollup(_cube, ['Category', 'REG_GROUP']).rename(columns={'n': 'Counts'})
+    fig = px.bar(df_plot, x="Category", y="Counts", color="REG_GROUP", text="Counts",
+                 barmode="stack", color_discrete_map={'EA': '#FFFF00', 'LP': '#DAA520'},
+                 category_orders={"Category": ["Detractor", "Passive", "Promoter"]})
+    fig.update_layout(paper_bgcolor='black', plot_bgcolor='black', height=400, font=dict(color="white"),
+                      margin=dict(t=10, b=80),
+                      xaxis=dict(
+                          title=None, showgrid=False, showline=False,
+                          tickfont=dict(color="white", size=13, weight='normal') # Eje X más notorio
+                      ),
+                      yaxis=dict(title=None, showgrid=False, showline=False, showticklabels=False),
+                      legend=dict(font=dict(color="white"), orientation="h", y=-0.15, x=0.5, xanchor="center"))
+
+    fig.for_each_trace(lambda t: t.update(
+        textposition='inside',
+        textfont=dict(
+            color="black" if t.name == "EA" else "white",
+            size=15,
+            family="Arial Black"
+        )
+    ))
+    return fig
+
+
+@memo_figure
+def fig_drivers_by_region(version, cats, _cube):
+    df_horiz_data = aggregates.rollup(_cube, ['Secondary Driver', 'REG_GROUP']).rename(columns={'n': 'Cuenta'})
+    order_map = df_horiz_data.groupby('Secondary Driver')['Cuenta'].sum().sort_values(ascending=False).index
+
+    fig_horiz = px.bar(
+        df_horiz_data,
+        y="Secondary Driver", x="Cuenta", color="REG_GROUP",
+        orientation='h', text="Cuenta",
+        color_discrete_map={'EA': '#FFFF00', 'LP': '#CC9900'},
+        category_orders={"Secondary Driver": list(order_map)},
+        custom_data=['Secondary Driver', 'REG_GROUP']
+    )
+
+    fig_horiz.update_layout(
+        paper_bgcolor='black', plot_bgcolor='black', height=400, font=dict(color="white"),
+        margin=dict(t=10, b=80, l=10, r=10),
+        xaxis=dict(
+            title=None, showgrid=False, showline=False, showticklabels=True,
+            tickfont=dict(color="white", size=13, weight='normal') # Eje X más notorio
+        ),
+        yaxis=dict(
+            title=None, showgrid=False, showline=False,
+            tickfont=dict(size=12, color="white", weight='normal')
+        ),
+        legend=dict(font=dict(color="white"), orientation="h", y=-0.15, x=0.5, xanchor="center")
+    )
+
+    fig_horiz.for_each_trace(lambda t: t.update(
+        textfont=dict(
+            color="black" if t.name == "EA" else "white",
+            size=14,
+            family="Arial Black"
+        )
+    ))
+    return fig_horiz
+
+
+# Estilo por región en el SCORE GAP; regiones adicionales toman colores de GAP_COLORS.
+GAP_STYLE = {'EA': ('#FFFF00', 'top center'), 'LP': ('#DAA520', 'bottom center')}
+GAP_COLORS = ['#FFFFFF', '#1E90FF', '#FF6347', '#32CD32']
+
+
+@memo_figure
+def fig_score_gap(version, cats, _cube):
+    df_stats = aggregates.rollup(_cube, ['Secondary Driver', 'REG_GROUP'])
+    df_stats['REG_GROUP'] = df_stats['REG_GROUP'].astype(str)
+    extra = sorted(set(df_stats['REG_GROUP']) - set(GAP_STYLE))
+    regions = list(GAP_STYLE) + extra
+    df_pivot = df_stats.pivot(index='Secondary Driver', columns='REG_GROUP', values='Score').reindex(columns=regions)
+    # Gap = distancia entre la mejor y la peor región (sin dato cuenta como 0); orden ascendente.
+    scores = df_pivot.to_numpy(float)
+    filled = np.nan_to_num(scores)
+    order = np.argsort(filled.max(axis=1) - filled.min(axis=1), kind='stable')
+    scores, drivers = scores[order], df_pivot.index.astype(str).to_numpy()[order]
+    # Conectores: un solo trazo con segmentos [min, max, NaN] por driver con al menos dos regiones.
+    both = np.isfinite(scores).sum(axis=1) >= 2
+    lo, hi = np.nanmin(scores[both], axis=1), np.nanmax(scores[both], axis=1)
+    fig_dumb = go.Figure(go.Scatter(
+        x=np.column_stack([lo, hi, np.full(len(lo), np.nan)]).ravel(), y=np.repeat(drivers[both], 3),
+        mode='lines', line=dict(color="#666666", width=1), hoverinfo='skip', showlegend=False))
+    for k, region in enumerate(regions):
+        color, position = GAP_STYLE.get(region, (GAP_COLORS[(k - len(GAP_STYLE)) % len(GAP_COLORS)], 'middle right'))
+        fig_dumb.add_trace(go.Scatter(x=scores[:, k], y=drivers, mode='markers+text', name=region,
+            marker=dict(color=color, size=14, line=dict(color='black', width=1)),
+            text=np.round(scores[:, k], 2), textposition=position, textfont=dict(color=color, size=11)))
+    fig_dumb.update_layout(paper_bgcolor='black', plot_bgcolor='black', height=max(600, len(drivers) * 60),
+        font=dict(color="white"), margin=dict(t=30, b=50, l=200, r=20),
+        xaxis=dict(title="Avg Score", showgrid=False, showline=True, linecolor="#444", autorange=True, dtick=1),
+        yaxis=dict(title=None, showgrid=False, categoryorder='array', categoryarray=drivers),
+        legend=dict(orientation="h", y=1.05, x=0.5, xanchor="center", font=dict(color="white")))
+    return fig_dumb
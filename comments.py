@@ -0,0 +1,130 @@
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+import streamlit as st
+import perf
+
+# --- ÍNDICE INVERTIDO DE COMENTARIOS (UNO POR VERSIÓN DE DATOS) ---
+# Tokens en minúsculas y sin tildes ("pésima" -> "pesima", "camión" -> "camion"); se ignoran stopwords en español.
+STOPWORDS = set("""
+a al algo algun alguna algunas alguno algunos ante antes como con contra cual cuando de del desde donde dos el ella
+ellas ellos en entre era eran es esa esas ese eso esos esta estaba estan estar estas este esto estos fue fueron ha
+habia han hasta hay la las le les lo los mas me mi mis mucho muy nada ni no nos o os otra otro para pero poco por
+porque que se ser si sin sobre son su sus tambien te tiene tienen todo todos tu un una uno unos y ya yo
+""".split())
+FILTERS = {'Primary Driver': 'Driver', 'REG_GROUP': 'Región', 'Category': 'Categoría'}
+MAX_RESULTS = 200
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def comment_column(df):
+    if 'Comment (Native Language)' in df.columns:
+        return 'Comment (Native Language)'
+    return next((c for c in df.columns if "COMMENT" in c.upper() or "NATIVE" in c.upper() or "VERBATIM" in c.upper()), None)
+
+
+def fold(text):
+    return unicodedata.normalize('NFKD', str(text).lower()).encode('ascii', 'ignore').decode()
+
+
+def tokenize(text):
+    return [t for t in _TOKEN.findall(fold(text)) if t not in STOPWORDS and len(t) > 1]
+
+
+class CommentIndex:
+    # Se indexan los textos distintos (los comentarios se repiten mucho) en formato CSR:
+    # vocab ordenado -> postings[indptr[i]:indptr[i+1]] = ids de texto;
+    # row_order[text_starts[j]:text_starts[j+1]] = filas del frame con el texto j.
+    def __init__(self, frame, column):
+        self.frame, self.column = frame, column
+        codes, texts = pd.factorize(frame[column].astype('object'), use_na_sentinel=True)
+        tokens = pd.Series([tokenize(t) for t in texts], dtype=object).explode().dropna()
+        pairs = pd.DataFrame({'token': tokens.to_numpy(dtype=str), 'doc': tokens.index.to_numpy()})
+        tf = pairs.groupby(['token', 'doc'], sort=True).size()
+        self.vocab, token_codes = np.unique(tf.index.get_level_values(0).to_numpy(dtype=str), return_inverse=True)
+        self.postings = tf.index.get_level_values(1).to_numpy()
+        self.tf = tf.to_numpy(float)
+        self.indptr = np.searchsorted(token_codes, np.arange(len(self.vocab) + 1))
+        self.n_texts = len(texts)
+        self.idf = np.log((1 + self.n_texts) / (1 + np.diff(self.indptr))) + 1
+        valid = np.flatnonzero(codes >= 0)
+        self.row_order = valid[np.argsort(codes[valid], kind='stable')]
+        self.text_starts = np.searchsorted(codes[self.row_order], np.arange(self.n_texts + 1))
+        # Opciones de los filtros, una vez por versión (no en cada tecla): valores presentes sin 'N/A'.
+        self.options = {field: sorted(v for v in frame[field].astype(str).unique() if v != 'N/A')
+                        for field in FILTERS if field in frame.columns}
+
+    def _expand(self, token, prefix):
+        # Rango de vocab con ese token exacto o (para la última palabra tecleada) con ese prefijo.
+        lo = np.searchsorted(self.vocab, token, side='left')
+        hi = np.searchsorted(self.vocab, token + '\x7f', side='left') if prefix else \
+            lo + int(lo < len(self.vocab) and self.vocab[lo] == token)
+        return lo, hi
+
+    def search(self, query, filters=None, limit=MAX_RESULTS):
+        terms = tokenize(query)
+        if not terms or self.n_texts == 0:
+            return self.frame.iloc[0:0].assign(score=[]), 0
+        prefix_last = not query.endswith(' ')
+        matched, score = np.zeros(self.n_texts, np.int32), np.zeros(self.n_texts)
+        for k, term in enumerate(terms):
+            lo, hi = self._expand(term, prefix_last and k == len(terms) - 1)
+            if hi <= lo:
+                return self.frame.iloc[0:0].assign(score=[]), 0
+            span = slice(self.indptr[lo], self.indptr[hi])
+            docs = self.postings[span]
+            weights = self.tf[span] * np.repeat(self.idf[lo:hi], np.diff(self.indptr[lo:hi + 1]))
+            score += np.bincount(docs, weights=weights, minlength=self.n_texts)
+            matched += np.bincount(docs, minlength=self.n_texts) > 0
+        # Todas las palabras deben aparecer (AND); las filas heredan el puntaje de su texto.
+        texts = np.flatnonzero(matched == len(terms))
+        starts, counts = self.text_starts[texts], np.diff(self.text_starts)[texts]
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        rows = self.row_order[np.repeat(starts, counts) + offsets]
+        row_score = np.repeat(score[texts], counts)
+        mask = np.ones(len(rows), bool)
+        for col, values in (filters or {}).items():
+            if values and col in self.frame.columns:
+                mask &= self._allowed(col, [values] if isinstance(values, str) else list(values), rows)
+        rows, row_score = rows[mask], row_score[mask]
+        top = np.argsort(-row_score, kind='stable')[:limit]
+        return self.frame.iloc[rows[top]].assign(score=row_score[top].round(2)), len(rows)
+
+    def _allowed(self, col, values, rows):
+        # Categóricas: se evalúan las categorías una vez y se indexa por código (código -1 = sin valor).
+        column = self.frame[col]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            allowed = np.append(column.cat.categories.astype(str).isin(values), False)
+            return allowed[column.cat.codes.to_numpy()[rows]]
+        return np.isin(column.to_numpy()[rows].astype(str), values)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def build_comment_index(version, _df):
+    perf.count('build:build_comment_index')
+    column = comment_column(_df)
+    return CommentIndex(_df, column) if column else None
+
+
+def render_search(df, version, key, defaults=None):
+    # Buscador de comentarios: palabras completas y la última como prefijo ("entreg" -> entrega, entregas...).
+    with perf.timer('comments', 'index'):
+        index = build_comment_index(version, df)
+    if index is None:
+        return
+    cols = st.columns([2] + [1] * len(FILTERS))
+    query = cols[0].text_input("Buscar en comentarios:", key=f"{key}_q", placeholder="p.ej. camion tarde")
+    filters = {}
+    for col, (field, label) in zip(cols[1:], FILTERS.items()):
+        if field in index.options:
+            options = index.options[field]
+            filters[field] = col.multiselect(f"{label}:", options, default=[v for v in (defaults or {}).get(field, []) if v in options],
+                                             key=f"{key}_{field}")
+    if not query.strip():
+        return
+    with perf.timer('comments', 'search'):
+        results, total = index.search(query, filters)
+    shown = [c for c in ['Customer ID', 'Score', 'Category', 'Primary Driver', 'Secondary Driver', 'REG_GROUP'] if c in df.columns]
+    st.caption(f"{total} comentarios" + (f" (se muestran los {len(results)} más relevantes)" if total > len(results) else ""))
+    st.dataframe(results[[index.column] + shown + ['score']], use_container_width=True, hide_index=True)
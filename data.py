@@ -0,0 +1,365 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import requests
+import streamlit as st
+from io import StringIO
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import history
+import perf
+import shared_cache
+import store
+
+log = logging.getLogger(__name__)
+
+# --- HOJAS DE GOOGLE SHEETS (NPS_SHEET_URL_* apunta a otra fuente, p.ej. el servidor de bench/) ---
+SHEET_URL_CURRENT = os.environ.get('NPS_SHEET_URL_CURRENT', "https://docs.google.com/spreadsheets/d/1Xxm55SMKuWPMt9EDji0-ccotPzZzLcdj623wqYcwlBs/edit?usp=sharing")
+SHEET_URL_MAP = os.environ.get('NPS_SHEET_URL_MAP', "https://docs.google.com/spreadsheets/d/1L-WNzMEAmvdcqSm0gvpRSzNUE29hwvxk396Q8MwUfUo/edit?usp=sharing")
+SHEET_URL_EVO = os.environ.get('NPS_SHEET_URL_EVO', "https://docs.google.com/spreadsheets/d/1TFzkoiDubO6E_m-bNMqk1QUl6JJgZ7uTB6si_WqmFHI/edit?gid=0#gid=0")
+
+
+def export_url(url, gid=None):
+    base_url = url.split('/edit')[0]
+    csv_url = f"{base_url}/export?format=csv"
+    return csv_url if gid is None else f"{csv_url}&gid={gid}"
+
+
+# --- NORMALIZACIÓN (UNA SOLA VEZ POR DESCARGA) ---
+# Columnas de texto repetitivo como category: cada valor distinto se guarda una vez y los filtros comparan códigos.
+CAT_COLS = ['Primary Driver', 'Secondary Driver', 'Category', 'Sales Region']
+REG_GROUPS = ['EA', 'LP', 'OTRO']
+SCHEMA = 4  # sube cuando cambian las columnas derivadas; invalida snapshots anteriores
+
+
+def region_groups(regions):
+    # Se clasifica cada región distinta (las categorías) y se expande por códigos; sin región -> OTRO.
+    regions = regions.astype('category')
+    up = regions.cat.categories.astype(str).str.upper()
+    group = np.select([up.str.contains('ALTO|EA'), up.str.contains('PAZ|LP')], REG_GROUPS[:2], 'OTRO')
+    codes = regions.cat.codes.to_numpy()
+    group = np.append(group, 'OTRO')[codes]  # código -1 (NaN) cae en el 'OTRO' agregado al final
+    return pd.Series(pd.Categorical(group, categories=REG_GROUPS), index=regions.index)
+
+
+def month_keys(dates):
+    # 'YYYY-MM' por fila sin strftime: solo se formatean los meses distintos; sin fecha -> N/A.
+    ym = (dates.dt.year * 100 + dates.dt.month).fillna(0).astype('int64').to_numpy()
+    uniq, codes = np.unique(ym, return_inverse=True)
+    labels = [f"{u // 100:04d}-{u % 100:02d}" if u else 'N/A' for u in uniq]
+    return pd.Series(pd.Categorical.from_codes(codes, labels), index=dates.index)
+
+
+def normalize_survey(df):
+    df.columns = df.columns.str.strip()
+    if 'Survey Completed Date' in df.columns:
+        df['Survey Completed Date'] = pd.to_datetime(df['Survey Completed Date'], errors='coerce')
+    for col in CAT_COLS:
+        if col in df.columns:
+            df[col] = df[col].fillna('N/A').astype(str).replace('nan', 'N/A').astype('category')
+    if 'Primary Driver' in df.columns:
+        # Driver canónico para comparaciones sin .str.strip().str.upper() por fila.
+        drivers = df['Primary Driver']
+        canon = drivers.cat.categories.str.strip().str.upper().to_numpy()
+        df['DRIVER_UP'] = pd.Series(pd.Categorical(canon[drivers.cat.codes.to_numpy()]), index=df.index)
+    df['REG_GROUP'] = region_groups(df['Sales Region']) if 'Sales Region' in df.columns \
+        else pd.Series(pd.Categorical(['OTRO'] * len(df), categories=REG_GROUPS), index=df.index)
+    df['Month'] = month_keys(df['Survey Completed Date']) if 'Survey Completed Date' in df.columns \
+        else pd.Series(pd.Categorical(['N/A'] * len(df)), index=df.index)
+    if 'Score' in df.columns:
+        df['Score'] = pd.to_numeric(df['Score'], errors='coerce').fillna(0).astype('float32')
+    return df
+
+
+def parse_table(text):
+    return normalize_survey(pd.read_csv(StringIO(text)))
+
+
+def parse_coords(text):
+    # Coordenadas: geo.py las lee por posición (código, longitud, latitud); solo se limpian los encabezados.
+    df = pd.read_csv(StringIO(text))
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def parse_headerless(text):
+    return pd.read_csv(StringIO(text), header=None)
+
+
+# nombre -> (url, gid, parser)
+DATASETS = {
+    "current": (SHEET_URL_CURRENT, None, parse_table),
+    "coords": (SHEET_URL_MAP, None, parse_coords),
+    "evolution": (SHEET_URL_EVO, 0, parse_headerless),
+}
+
+
+# Hojas de respuestas crudas que además alimentan el historial mensual (history.py).
+HISTORY_SOURCES = {"current"}
+
+
+# --- REGISTRO EN MEMORIA (UN DATAFRAME POR HOJA, COMPARTIDO ENTRE SESIONES; NO MUTAR) ---
+TTL = 600          # segundos antes de revalidar contra Google
+TTLS = {"evolution": 120}  # la hoja de evolución se edita a mano durante las reuniones mensuales
+MIN_REFRESH = 15   # varios "ACTUALIZAR" seguidos comparten una sola revalidación
+RETRY_AFTER = 60   # si Google falla, se sirve la última versión buena y se reintenta tras esto
+TIMEOUT = (5, 30)  # (conexión, lectura) en segundos
+BACKGROUND_GRACE = 3  # con scheduler.py activo, TTLs que se toleran antes de volver a bloquear una página
+
+
+class _Entry:
+    __slots__ = ('frame', 'version', 'etag', 'last_modified', 'checked_at')
+
+    def __init__(self, frame, version, etag=None, last_modified=None):
+        self.frame, self.version = frame, version
+        self.etag, self.last_modified = etag, last_modified
+        self.checked_at = time.time()
+
+
+_entries = {}
+background = False  # lo activa scheduler.start()
+_locks = {name: threading.Lock() for name in DATASETS}
+_session = None
+_session_lock = threading.Lock()
+
+
+def _http():
+    # Sesión única con pool de conexiones y reintentos con backoff (0.5s, 1s, 2s).
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=['GET'])
+            adapter = HTTPAdapter(pool_connections=len(DATASETS), pool_maxsize=len(DATASETS), max_retries=retry)
+            _session = requests.Session()
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+
+def _fetch(name, entry):
+    # GET condicional: si la hoja no cambió no se vuelve a parsear nada.
+    url, gid, parser = DATASETS[name]
+    headers = {}
+    if entry is not None:
+        if entry.etag: headers['If-None-Match'] = entry.etag
+        if entry.last_modified: headers['If-Modified-Since'] = entry.last_modified
+    with perf.timer(name, 'fetch'):
+        response = _http().get(export_url(url, gid), headers=headers, timeout=TIMEOUT)
+    perf.count(f"http_{response.status_code}:{name}")
+    if response.status_code == 304 and entry is not None:
+        entry.checked_at = time.time()
+        return entry
+    response.raise_for_status()
+    perf.count(f"bytes_in:{name}", len(response.content))
+    version = hashlib.sha1(response.content).hexdigest()[:12]
+    etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+    if entry is not None and entry.version == version:
+        entry.etag, entry.last_modified, entry.checked_at = etag, last_modified, time.time()
+        return entry
+    with perf.timer(name, 'parse'):
+        frame = parser(response.text)
+    return _Entry(frame, version, etag, last_modified)
+
+
+def _save(name, entry, history_synced=False):
+    try:
+        with perf.timer(name, 'snapshot_save'):
+            store.save_snapshot(name, entry.frame, entry.version, etag=entry.etag, last_modified=entry.last_modified,
+                                schema=SCHEMA)
+    except Exception as e:
+        log.warning("No se pudo guardar el snapshot de %s: %s", name, e)
+    if not history_synced:
+        sync_history(name, entry)
+
+
+def sync_history(name, entry):
+    if name not in HISTORY_SOURCES:
+        return
+    try:
+        with perf.timer(name, 'history_save'):
+            history.write_partitions(entry.frame)
+    except Exception as e:
+        log.warning("No se pudo actualizar el historial con %s: %s", name, e)
+
+
+def _restore(name):
+    # Arranque en frío: se sirve el snapshot local y se reconcilia con Google en segundo plano.
+    with _locks[name]:
+        if name in _entries:
+            return _entries[name]
+        try:
+            with perf.timer(name, 'snapshot_load'):
+                snap = store.load_snapshot(name)
+        except Exception as e:
+            log.warning("Snapshot de %s ilegible: %s", name, e)
+            snap = None
+        if snap is None or snap[1].get('schema') != SCHEMA:
+            return None
+        frame, meta = snap
+        entry = _entries[name] = _Entry(frame, meta['version'], meta.get('etag'), meta.get('last_modified'))
+    threading.Thread(target=_reconcile, args=(name,), daemon=True).start()
+    return entry
+
+
+def _reconcile(name):
+    try:
+        _get_entry(name, max_age=0)
+    except Exception as e:
+        log.warning("No se pudo reconciliar %s con Google Sheets: %s", name, e)
+
+
+def _ttl(name):
+    return TTLS.get(name, TTL)
+
+
+# --- CACHÉ COMPARTIDA ENTRE RÉPLICAS (shared_cache.py; sin NPS_SHARED_CACHE todo esto no hace nada) ---
+def _shared_entry(name, entry):
+    # Versión que dejó en la caché compartida cualquier réplica; si es la misma que la local solo se
+    # actualiza la hora de revalidación (o se marca vencida si alguien la invalidó).
+    meta = shared_cache.get_meta(name)
+    if not meta or meta.get('schema') != SCHEMA:
+        return entry
+    checked_at = 0 if meta.get('invalidated_at', 0) > meta['checked_at'] else meta['checked_at']
+    if entry is not None and entry.version == meta['version']:
+        entry.checked_at = 0 if not checked_at else max(entry.checked_at, checked_at)
+        return entry
+    frame = shared_cache.get_frame(shared_cache.sheet_key(name, meta['version']))
+    if frame is None:
+        return entry
+    perf.count(f"shared_adopt:{name}")
+    adopted = _Entry(frame, meta['version'], meta.get('etag'), meta.get('last_modified'))
+    adopted.checked_at = checked_at
+    return adopted
+
+
+def _share(name, entry, previous):
+    if not shared_cache.enabled():
+        return
+    if entry is not previous:
+        shared_cache.put_frame(shared_cache.sheet_key(name, entry.version), entry.frame)
+    shared_cache.put_meta(name, dict(version=entry.version, etag=entry.etag, last_modified=entry.last_modified,
+                                     checked_at=entry.checked_at, schema=SCHEMA))
+
+
+def shared_changed(name):
+    # Otra réplica publicó una versión nueva o alguien invalidó la hoja (lo usa scheduler.py).
+    if not shared_cache.enabled():
+        return False
+    meta, entry = shared_cache.get_meta(name), _entries.get(name)
+    return bool(meta) and (entry is None or meta['version'] != entry.version or
+                           meta.get('invalidated_at', 0) > max(meta['checked_at'], entry.checked_at))
+
+
+def _get_entry(name, max_age=None):
+    if max_age is None:
+        # Con el refresco en segundo plano activo (scheduler.py) las páginas no esperan a Google:
+        # se sirve la versión publicada mientras no pase de BACKGROUND_GRACE veces su TTL.
+        max_age = _ttl(name) * (BACKGROUND_GRACE if background else 1)
+    entry = _entries.get(name) or _restore(name)
+    if shared_cache.enabled() and not background:
+        # Sin scheduler cada página adopta lo que otra réplica ya descargó; con scheduler lo adopta él y pre-calcula.
+        adopted = _shared_entry(name, entry)
+        if adopted is not entry:
+            with _locks[name]:
+                entry = _entries[name] = adopted
+    if entry is not None and time.time() - entry.checked_at < max_age:
+        perf.count(f"registry_hit:{name}")
+        return entry
+    # Un solo hilo (y con caché compartida, una sola réplica) revalida cada hoja; el resto espera y reutiliza el resultado.
+    with _locks[name], shared_cache.lock(name):
+        entry = _shared_entry(name, _entries.get(name))
+        if entry is not None:
+            _entries[name] = entry
+        if entry is not None and time.time() - entry.checked_at < max_age:
+            return entry
+        try:
+            fetched = _entries[name] = _fetch(name, entry)
+        except Exception as e:
+            if entry is None:
+                raise
+            log.warning("Fallo al descargar %s, se usa la última versión buena: %s", name, e)
+            entry.checked_at = time.time() - _ttl(name) + min(RETRY_AFTER, _ttl(name))
+            return entry
+        _share(name, fetched, entry)
+    if fetched is not entry:
+        _save(name, fetched)
+    return fetched
+
+
+def prepare(name, max_age=0):
+    # Descarga sin publicar: devuelve la entrada nueva (o la publicada si no cambió) para pre-calcular sobre ella.
+    # Con caché compartida se reutiliza lo que otra réplica descargó hace menos de max_age segundos.
+    with _locks[name], shared_cache.lock(name):
+        entry = _shared_entry(name, _entries.get(name))
+        if entry is not None and time.time() - entry.checked_at < max_age:
+            return entry
+        fetched = _fetch(name, entry)
+        _share(name, fetched, entry)
+        return fetched
+
+
+def publish(name, entry, history_synced=False):
+    # Cambio atómico de versión: las sesiones ven la anterior o la nueva, nunca una mezcla.
+    with _locks[name]:
+        changed = _entries.get(name) is not entry
+        _entries[name] = entry
+    if changed:
+        _save(name, entry, history_synced)
+    return changed
+
+
+def published(name):
+    return _entries.get(name)
+
+
+def needs_refresh(name, fraction=1.0):
+    entry = _entries.get(name)
+    return entry is None or time.time() - entry.checked_at >= _ttl(name) * fraction
+
+
+def load_dataset(name):
+    return _get_entry(name).frame
+
+
+def dataset_version(name):
+    entry = _entries.get(name)
+    return entry.version if entry is not None else None
+
+
+def _in_parallel(fn, names):
+    # Todas las hojas se piden a la vez; los errores se devuelven para mostrarlos en el hilo de la vista.
+    def run(name):
+        try:
+            return fn(name), None
+        except Exception as e:
+            return None, e
+    if len(names) == 1:
+        return [run(names[0])]
+    with ThreadPoolExecutor(max_workers=len(names)) as pool:
+        return list(pool.map(run, names))
+
+
+def refresh(*names):
+    # Invalida solo las hojas indicadas, sin tocar las demás ni otras cachés.
+    for name, (_, e) in zip(names, _in_parallel(lambda n: _get_entry(n, max_age=MIN_REFRESH), names)):
+        if e is not None:
+            st.error(f"Error actualizando {name}: {e}")
+
+
+def get_datasets(*names):
+    frames = []
+    for frame, e in _in_parallel(load_dataset, names):
+        if e is not None:
+            st.error(f"Error cargando datos de Sheets: {e}")
+            frame = pd.DataFrame()
+        frames.append(frame)
+    return frames
+
+
+def get_dataset(name):
+    return get_datasets(name)[0]
@@ -0,0 +1,191 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+import perf
+
+# --- PARSER DE LA HOJA DE EVOLUCIÓN MENSUAL ---
+# Cada sitio es un bloque de 3 filas: real (col 1 = año actual), BGT y año anterior;
+# col 2 = YTD y cols 3..14 = ENE..DIC. Debajo van las filas de drivers detractores.
+MESES = ["ENE", "FEB", "MAR", "ABR", "MAY", "JUN", "JUL", "AGO", "SEP", "OCT", "NOV", "DIC"]
+SERIES = ['actual', 'bgt', 'prior']
+COL_LABEL, COL_YTD, COL_MESES = 1, 2, slice(3, 15)
+# Solo si la hoja no trae etiquetas reconocibles se usa la disposición histórica.
+LEGACY_BLOCKS = [(2, 'CD EL ALTO'), (7, 'EA'), (11, 'LP')]
+LEGACY_DETRACTORS = [18, 20, 22]
+
+
+def _is_budget(label):
+    up = str(label).strip().upper()
+    return 'BGT' in up or 'BUDGET' in up or 'PPTO' in up or up == 'BU' or up.startswith('BU ')
+
+
+def _text(v):
+    return str(v).strip() if pd.notnull(v) and str(v).strip() else None
+
+
+def _row_values(raw, r):
+    return pd.to_numeric(raw.iloc[r, COL_MESES], errors='coerce').tolist()
+
+
+def _has_numbers(raw, r):
+    return pd.to_numeric(raw.iloc[r, COL_YTD:COL_MESES.stop], errors='coerce').notna().any()
+
+
+def _find_blocks(raw):
+    blocks, last_end = [], 0
+    for r in range(1, len(raw) - 1):
+        if not _is_budget(raw.iloc[r, COL_LABEL]) or not (_has_numbers(raw, r - 1) and _has_numbers(raw, r + 1)):
+            continue
+        # Nombre del sitio: primera celda de texto en col 0 del bloque o de las filas encima.
+        site = next((_text(raw.iloc[i, 0]) for i in [r - 1, r, r + 1] + list(range(r - 2, last_end - 1, -1))
+                     if 0 <= i < len(raw) and _text(raw.iloc[i, 0])), None)
+        blocks.append((r - 1, site))
+        last_end = r + 2
+    if not blocks and len(raw) > LEGACY_BLOCKS[-1][0] + 2:
+        return LEGACY_BLOCKS
+    names, out = [s for _, s in LEGACY_BLOCKS], []
+    for i, (r, site) in enumerate(blocks):
+        site = site or (names[i] if i < len(names) else f"SITIO {i + 1}")
+        if site in [s for _, s in out]:
+            site = f"{site} {i + 1}"
+        out.append((r, site))
+    return out
+
+
+def _find_detractors(raw, first_row, found):
+    # Hoja con la disposición histórica: drivers en 18/20/22 y debajo de cada uno una subfila (p.ej. '%') que no
+    # es un driver aunque tenga etiqueta y números.
+    if [r for r, _ in found] == [r for r, _ in LEGACY_BLOCKS] and len(raw) > LEGACY_DETRACTORS[-1]:
+        return LEGACY_DETRACTORS
+    # Si no, filas con nombre de driver (con letras: '%' o '#' son subfilas) y números debajo del último bloque.
+    rows = [r for r in range(first_row, len(raw))
+            if any(ch.isalpha() for ch in _text(raw.iloc[r, 0]) or '') and not _is_budget(raw.iloc[r, COL_LABEL])
+            and _has_numbers(raw, r)]
+    if not rows and len(raw) > LEGACY_DETRACTORS[-1]:
+        return LEGACY_DETRACTORS
+    return rows
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def parse_evolution(version, _raw):
+    perf.count('build:parse_evolution')
+    raw = _raw
+    blocks = {}
+    found = _find_blocks(raw)
+    for start, site in found:
+        block = {}
+        for k, serie in enumerate(SERIES):
+            r = start + k
+            label, values = str(raw.iloc[r, COL_LABEL]), _row_values(raw, r)
+            ytd = pd.to_numeric(raw.iloc[r, COL_YTD], errors='coerce')
+            block[serie] = (label, values, ytd)
+        blocks[site] = block
+    first_det = max(r for r, _ in found) + 3 if found else 0
+    detractors = []
+    for r in _find_detractors(raw, first_det, found):
+        texts = [v if pd.notnull(v) else None for v in raw.iloc[r, COL_MESES]]
+        detractors.append({'driver': str(raw.iloc[r, 0]), 'months': texts, 'ytd': raw.iloc[r, COL_YTD],
+                           'values': _row_values(raw, r)})
+    return {
+        'blocks': blocks,
+        'detractors': detractors,
+    }
+
+
+# Orden de los bloques en la vista mensual y en las diapositivas (sitios nuevos se agregan al final).
+SITE_ORDER = ["CD EL ALTO", "LP", "EA"]
+
+
+def site_key(site):
+    # Nombre de la hoja -> clave de SITE_ORDER / SITE_REGIONS: 'NPS  Ea ' -> 'EA'.
+    key = ' '.join(str(site).upper().split())
+    return key[4:] if key.startswith('NPS ') else key
+
+
+def ordered_sites(blocks):
+    return sorted(blocks, key=lambda s: SITE_ORDER.index(site_key(s)) if site_key(s) in SITE_ORDER else len(SITE_ORDER))
+
+
+def block_title(site, block):
+    # Título compacto para PPT: último mes con dato vs BGT y YTD vs BGT YTD.
+    (_, real, ytd_real), (_, bgt, ytd_bgt) = block['actual'], block['bgt']
+    valid = [i for i, v in enumerate(real) if pd.notnull(v) and v != 0]
+    last = valid[-1] if valid else 0
+    prefix = site if site.upper().startswith("NPS") else f"NPS {site}"
+    return f"{prefix} | {int(real[last])} {MESES[last]} vs {int(bgt[last])} BGT | {int(ytd_real)} YTD vs {int(ytd_bgt)} BGT YTD"
+
+
+# --- EVOLUCIÓN CALCULADA DESDE EL HISTORIAL (EL BGT SIGUE SALIENDO DE LA HOJA) ---
+# Sitio de la hoja -> grupos de región del cubo (None = todas). Sitios sin mapeo conservan los números de la hoja.
+SITE_REGIONS = {'CD EL ALTO': None, 'EA': ['EA'], 'LP': ['LP']}
+DETRACTOR_ROWS = 10
+
+
+def sheet_year(evo):
+    # Año de la serie real: su etiqueta en la hoja (p.ej. '2025').
+    for block in evo['blocks'].values():
+        label = str(block['actual'][0]).strip()[:4]
+        if label.isdigit():
+            return int(label)
+    return None
+
+
+def _nps(p, d, n):
+    return float(np.round((p - d) / n * 100)) if n else None
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def from_history(version, _evo, _cube):
+    # Reemplaza real, año anterior, YTD y detractores por lo calculado desde las respuestas crudas
+    # en los meses que el historial cubre; el YTD y los detractores solo si cubre todos los meses con dato en la hoja.
+    perf.count('build:from_history')
+    evo, cube = _evo, _cube[_cube['Month'] != 'N/A']
+    month = cube['Month'].astype(str)
+    c = pd.DataFrame({'REG_GROUP': cube['REG_GROUP'].astype(str).to_numpy(),
+                      'year': month.str[:4].astype(int).to_numpy(), 'm': month.str[5:7].astype(int).to_numpy() - 1,
+                      'P': np.where(cube['Category'] == 'Promoter', cube['n'], 0),
+                      'D': np.where(cube['Category'] == 'Detractor', cube['n'], 0), 'n': cube['n'].to_numpy()})
+    year = sheet_year(evo) or (int(c['year'].max()) if len(c) else None)
+    by_region = c.groupby(['REG_GROUP', 'year', 'm'])[['P', 'D', 'n']].sum()
+    seen = set(zip(c['year'], c['m']))
+
+    def with_data(values):
+        return {i for i, v in enumerate(values) if pd.notnull(v)}
+
+    def covered(y, months):
+        # El historial trae ese año y todos los meses que la hoja tiene con dato.
+        return any((y, i) in seen for i in range(12)) and all((y, i) in seen for i in months)
+
+    blocks = {}
+    for site, block in evo['blocks'].items():
+        if site_key(site) not in SITE_REGIONS or year is None:
+            blocks[site] = block
+            continue
+        regions = SITE_REGIONS[site_key(site)]
+        sub = by_region if regions is None else by_region[by_region.index.get_level_values(0).isin(regions)]
+        sub = sub.groupby(level=['year', 'm']).sum()
+        new = dict(block)
+        for serie, y in (('actual', year), ('prior', year - 1)):
+            label, values, ytd = block[serie]
+            calc = [_nps(*sub.loc[(y, i)]) if (y, i) in sub.index else v for i, v in enumerate(values)]
+            if covered(y, with_data(values)) and y in sub.index.get_level_values(0):
+                ytd = _nps(*sub.loc[y].sum())
+            new[serie] = (label, calc, ytd)
+        blocks[site] = new
+
+    detractors = evo['detractors']
+    sheet_months = set().union(*(with_data(b['actual'][1]) for b in evo['blocks'].values()))
+    if year is not None and covered(year, sheet_months):
+        mask = (c['year'] == year).to_numpy() & (cube['Category'] == 'Detractor').to_numpy() & \
+            (cube['Secondary Driver'] != 'N/A').to_numpy()
+        det = pd.DataFrame({'driver': cube['Secondary Driver'].astype(str).to_numpy()[mask],
+                            'm': c['m'].to_numpy()[mask], 'n': c['n'].to_numpy()[mask]})
+        counts = det.pivot_table(index='driver', columns='m', values='n', aggfunc='sum', fill_value=0) \
+            .reindex(columns=range(12), fill_value=0)
+        ytd = counts.sum(axis=1).sort_values(ascending=False, kind='stable').head(DETRACTOR_ROWS)
+        detractors = []
+        for driver, total in ytd.items():
+            values = [int(counts.at[driver, i]) if (year, i) in seen else None for i in range(12)]
+            detractors.append({'driver': driver, 'months': values, 'ytd': int(total), 'values': values})
+    return {'blocks': blocks, 'detractors': detractors,
+            'history_months': sorted(f"{y}-{m + 1:02d}" for y, m in seen if y in (year, (year or 0) - 1))}
@@ -0,0 +1,272 @@
+import argparse
+import datetime
+import importlib.util
+import logging
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import aggregates
+import charts
+import data
+import evolution
+import history
+import nps_engine
+
+log = logging.getLogger(__name__)
+
+# --- EXPORTACIÓN DE TODAS LAS VISTAS A PNG + PPTX/PDF (SIN NAVEGADOR NI CAPTURAS A MANO) ---
+# python export.py --months period,last --format pptx
+# Mismos builders de charts.py que las vistas. Las imágenes las renderiza kaleido en un pool de procesos: un lote por
+# sitio (evolución mensual) y por periodo (dashboard + EA/LP). Dependencias opcionales: kaleido (+ Chrome) para las
+# imágenes y python-pptx para el .pptx; sin python-pptx el mazo se arma en PDF con Pillow.
+SLIDE_PX = (1920, 1080)  # página del PDF y ancho de referencia de las imágenes; el PPTX usa la misma proporción 16:9
+TITLE_H = 0.09           # franja amarilla del título, en fracción del alto
+MARGIN = 0.02
+DEFAULT_CATS = ('Detractor', 'Passive', 'Promoter')
+MONTH = re.compile(r'^\d{4}-\d{2}$')
+
+
+def _load(name):
+    # Revalida contra Google (GET condicional); sin conexión se exporta el último snapshot.
+    try:
+        data.publish(name, data.prepare(name))
+    except Exception as e:
+        log.warning("No se pudo actualizar %s, se usa la última versión guardada: %s", name, e)
+    return data.load_dataset(name)
+
+
+# --- DIAPOSITIVAS: (título, figuras, anchos relativos como los st.columns de cada vista) ---
+def _slide(title, figs, ratios):
+    kept = [(f, r) for f, r in zip(figs, ratios) if f is not None]
+    return (title, [f for f, _ in kept], [r for _, r in kept]) if kept else None
+
+
+def monthly_sections(evo, version):
+    sections = [(site, [_slide(evolution.block_title(site, block), [charts.fig_nps_line(version, site, block),
+                                                                       charts.fig_nps_ytd(version, site, block)], [3, 1.2])])
+                for site, block in ((s, evo['blocks'][s]) for s in evolution.ordered_sites(evo['blocks']))]
+    rings = [charts.fig_detractor_ring(version, d['driver'], d['ytd']) for d in evo['detractors'][:3]]
+    sections.append(('detractors', [_slide("DETRACTORS", rings, [1] * len(rings))]))
+    return sections
+
+
+def dashboard_slides(cube, version, label):
+    segments = nps_engine.build_segments(version, cube)
+    return [
+        _slide(f"PRIMARY DRIVERS | {label}", [charts.fig_primary_composition(version, cube), charts.fig_primary_score(version, cube)], [1, 1]),
+        _slide(f"CATEGORIES | {label}", [charts.fig_category_composition(version, 'All', DEFAULT_CATS, cube),
+                                         charts.fig_secondary_volume(version, 'All', DEFAULT_CATS, cube)], [1, 2]),
+        _slide(f"AVG SCORE BY SECONDARY DRIVER | {label}", [charts.fig_secondary_score(version, 'All', DEFAULT_CATS, cube)], [1]),
+        _slide(f"NPS BY DRIVER (95% CI) | {label}", [charts.fig_nps_ci(version, 'All', segments)], [1]),
+    ]
+
+
+def ea_lp_slides(cube, version, label):
+    # Mismo recorte que la vista EA/LP con todas las categorías seleccionadas.
+    delivery = aggregates.delivery(cube)
+    cats = tuple(sorted(c for c in delivery['Category'].unique() if str(c) not in ['nan', 'N/A']))
+    df_final = aggregates.slice_cube(delivery, {'REG_GROUP': ['EA', 'LP'], 'Category': list(cats)})
+    if df_final.empty:
+        return []
+    return [
+        _slide(f"PERFORMANCE EA / LP | {label}", [charts.fig_region_distribution(version, cats, df_final),
+                                                  charts.fig_drivers_by_region(version, cats, df_final)], [1.5, 2.5]),
+        _slide(f"SCORE GAP ANALYSIS | {label}", [charts.fig_score_gap(version, cats, df_final)], [1]),
+    ]
+
+
+def periods(df, version, months):
+    # months: 'period' (la hoja completa, como abre el dashboard), 'last', 'all' (cada mes de la hoja) o YYYY-MM
+    # (también meses que solo están en el historial). Devuelve [(etiqueta, versión, cubo)].
+    cube = aggregates.build_cube(version, df)
+    current = [m for m in df['Month'].cat.categories if m != 'N/A'] if 'Month' in df.columns else []
+    out = [(f"{current[0]} a {current[-1]}" if current else "HOJA ACTUAL", version, cube)] if 'period' in months else []
+    selected = current if 'all' in months else current[-1:] if 'last' in months else []
+    stored = history.months()
+    for m in selected + [m for m in months if MONTH.match(m) and m not in selected]:
+        if m in current:
+            out.append((m, f"{version}@{m}", cube[cube['Month'] == m]))
+        elif m in stored:
+            range_v = history.range_version(m, m)
+            out.append((m, f"hist-{range_v}", aggregates.build_cube(f"hist-{range_v}", history.load_range(range_v, m, m))))
+        else:
+            log.warning("Sin datos para %s: no está en la hoja ni en el historial", m)
+    return out
+
+
+# --- RENDER EN PARALELO (UN CHROME POR PROCESO, REUTILIZADO EN TODO SU LOTE) ---
+def _chrome_missing():
+    # kaleido >= 1 arranca su servidor en un hilo que muere sin avisar si no encuentra Chrome, y las llamadas
+    # siguientes esperan para siempre: se busca Chrome (o BROWSER_PATH) antes de abrir el pool.
+    try:
+        from choreographer.browsers.chromium import Chromium
+    except ImportError:
+        return False  # kaleido < 1 trae su propio Chromium
+    return Chromium.find_browser(skip_local=False) is None
+
+
+def _init_worker():
+    import kaleido
+    if not hasattr(kaleido, 'start_sync_server'):
+        return  # kaleido < 1 no necesita servidor
+    if _chrome_missing():
+        raise RuntimeError("Chrome no encontrado")  # rompe el pool (BrokenProcessPool) en vez de colgar los lotes
+    kaleido.start_sync_server(silence_warnings=True)
+
+
+def render_batch(jobs, scale):
+    # jobs: [(ruta, figura JSON, ancho, alto)]. Fondo negro como en la app (varias figuras usan fondo transparente).
+    import plotly.io as pio
+    figs = [pio.from_json(spec).update_layout(paper_bgcolor='black') for _, spec, _, _ in jobs]
+    paths, widths, heights = [j[0] for j in jobs], [j[2] for j in jobs], [j[3] for j in jobs]
+    if hasattr(pio, 'write_images'):
+        pio.write_images(figs, paths, width=widths, height=heights, scale=scale)
+    else:
+        for fig, path, w, h in zip(figs, paths, widths, heights):
+            fig.write_image(path, width=w, height=h, scale=scale)
+    return paths
+
+
+def render(sections, out_dir, workers, scale):
+    # Cada imagen se dibuja al ancho de su columna en una diapositiva de SLIDE_PX: los textos quedan como en la app.
+    os.makedirs(out_dir, exist_ok=True)
+    batches, slides = [], []
+    for name, section_slides in sections:
+        jobs = []
+        for title, figs, ratios in filter(None, section_slides):
+            images = []
+            for fig, ratio in zip(figs, ratios):
+                path = os.path.join(out_dir, f"{len(slides) + 1:02d}-{len(images) + 1}-{_slug(name)}.png")
+                width = int(SLIDE_PX[0] * (1 - 2 * MARGIN) * ratio / sum(ratios))
+                jobs.append((path, fig.to_json(), width, int(fig.layout.height or 450)))
+                images.append((path, width, jobs[-1][3]))
+            slides.append((title, images, ratios))
+        if jobs:
+            batches.append(jobs)
+    if batches:
+        with ProcessPoolExecutor(max_workers=min(workers, len(batches)), initializer=_init_worker) as pool:
+            list(pool.map(render_batch, batches, [scale] * len(batches)))
+    return slides
+
+
+def _slug(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+# --- MAZO: PPTX (python-pptx) O PDF (Pillow) ---
+def _boxes(images, ratios):
+    # (x, y, ancho, alto) en fracciones de la diapositiva: cada imagen en su columna, escalada sin deformar y centrada.
+    top, avail_h = TITLE_H + MARGIN, 1 - TITLE_H - 2 * MARGIN
+    x, boxes = MARGIN, []
+    for (_, w, h), ratio in zip(images, ratios):
+        col_w = (1 - 2 * MARGIN) * ratio / sum(ratios)
+        k = min(col_w * SLIDE_PX[0] / w, avail_h * SLIDE_PX[1] / h)
+        bw, bh = w * k / SLIDE_PX[0], h * k / SLIDE_PX[1]
+        boxes.append((x + (col_w - bw) / 2, top + (avail_h - bh) / 2, bw, bh))
+        x += col_w
+    return boxes
+
+
+def build_pptx(slides, path):
+    from pptx import Presentation
+    from pptx.dml.color import RGBColor
+    from pptx.enum.shapes import MSO_SHAPE
+    from pptx.util import Emu, Pt
+    prs = Presentation()
+    prs.slide_width, prs.slide_height = Emu(12192000), Emu(6858000)  # 16:9
+    sw, sh = prs.slide_width, prs.slide_height
+    for title, images, ratios in slides:
+        slide = prs.slides.add_slide(prs.slide_layouts[6])  # en blanco
+        slide.background.fill.solid()
+        slide.background.fill.fore_color.rgb = RGBColor(0, 0, 0)
+        bar = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, 0, sw, int(sh * TITLE_H))
+        bar.fill.solid()
+        bar.fill.fore_color.rgb = RGBColor(0xFF, 0xFF, 0x00)
+        bar.line.fill.background()
+        run = bar.text_frame.paragraphs[0].add_run()
+        run.text, run.font.bold, run.font.size = title, True, Pt(20)
+        run.font.color.rgb = RGBColor(0, 0, 0)
+        for (img, _, _), (x, y, w, h) in zip(images, _boxes(images, ratios)):
+            slide.shapes.add_picture(img, int(sw * x), int(sh * y), int(sw * w), int(sh * h))
+    prs.save(path)
+
+
+def _font(ImageFont, size):
+    # Fuente del sistema con tildes (Linux / Windows / macOS); la de Pillow solo trae ASCII.
+    for name in ('DejaVuSans-Bold.ttf', 'arialbd.ttf', 'Arial Bold.ttf'):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            pass
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1: fuente fija
+        return ImageFont.load_default()
+
+
+def build_pdf(slides, path):
+    from PIL import Image, ImageDraw, ImageFont
+    W, H = SLIDE_PX
+    font = _font(ImageFont, 34)
+    pages = []
+    for title, images, ratios in slides:
+        page = Image.new('RGB', SLIDE_PX, 'black')
+        draw = ImageDraw.Draw(page)
+        draw.rectangle([0, 0, W, int(H * TITLE_H)], fill='#FFFF00')
+        draw.text((W / 2, H * TITLE_H / 2), title, fill='black', font=font, anchor='mm')
+        for (img, _, _), (x, y, w, h) in zip(images, _boxes(images, ratios)):
+            with Image.open(img) as im:
+                im = im.convert('RGBA').resize((int(W * w), int(H * h)), Image.LANCZOS)
+                page.paste(im, (int(W * x), int(H * y)), im)
+        pages.append(page)
+    pages[0].save(path, save_all=True, append_images=pages[1:], resolution=150)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta las gráficas de todas las vistas a PNG y a un mazo PPTX/PDF.")
+    parser.add_argument('--months', default='period', help="period, last, all y/o meses YYYY-MM separados por coma")
+    parser.add_argument('--format', choices=['pptx', 'pdf', 'png'], default='pptx')
+    parser.add_argument('--out', default='exports')
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument('--scale', type=float, default=2, help="factor de resolución de las imágenes")
+    args = parser.parse_args(argv)
+    if importlib.util.find_spec('kaleido') is None:
+        sys.exit("Falta kaleido para renderizar las imágenes: pip install kaleido (y Chrome: plotly_get_chrome)")
+    if _chrome_missing():
+        sys.exit("No se pudieron renderizar las imágenes (¿Chrome instalado? plotly_get_chrome): Chrome no encontrado")
+    fmt = args.format
+    if fmt == 'pptx' and importlib.util.find_spec('pptx') is None:
+        print("python-pptx no está instalado: se genera PDF (pip install python-pptx para PPTX).")
+        fmt = 'pdf'
+
+    start = time.perf_counter()
+    raw_evo, df = _load('evolution'), _load('current')
+    evo, evo_version = history.monthly_evolution(data.dataset_version('evolution'), raw_evo)
+    sections = monthly_sections(evo, evo_version)
+    for label, version, cube in periods(df, data.dataset_version('current'), [m.strip() for m in args.months.split(',')]):
+        sections.append((label, dashboard_slides(cube, version, label) + ea_lp_slides(cube, version, label)))
+    built = time.perf_counter()
+
+    stamp = datetime.date.today().isoformat()
+    out_dir = os.path.join(args.out, f"nps_{stamp}")
+    try:
+        slides = render(sections, out_dir, args.workers, args.scale)
+    except Exception as e:
+        sys.exit(f"No se pudieron renderizar las imágenes (¿Chrome instalado? plotly_get_chrome): {e}")
+    rendered = time.perf_counter()
+    n_images = sum(len(images) for _, images, _ in slides)
+    print(f"{len(slides)} diapositivas, {n_images} imágenes: figuras {built - start:.1f} s, "
+          f"render {rendered - built:.1f} s ({min(args.workers, len(sections))} procesos)")
+    if fmt != 'png' and slides:
+        path = os.path.join(args.out, f"nps_{stamp}.{fmt}")
+        (build_pptx if fmt == 'pptx' else build_pdf)(slides, path)
+        print(f"Mazo: {path} ({time.perf_counter() - rendered:.1f} s)")
+    print(f"Imágenes: {out_dir}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    main()
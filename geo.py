@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+import perf
+
+# --- CRUCE ENCUESTA x COORDENADAS + ÍNDICE DE CLIENTES ---
+MAP_COLS = ['Customer ID', 'Lon', 'Lat', 'Score', 'Primary Driver', 'Category']
+MAP_ZOOM = 10
+CELL_PX = 4  # lado de la celda de agregación en píxeles de pantalla (el radio del heatmap es 20 px)
+
+
+def normalize_ids(ids):
+    return ids.astype(str).str.replace(r'\.0$', '', regex=True).str.strip()
+
+
+class GeoIndex:
+    # frame: filas encuesta+coordenadas ordenadas por Customer ID.
+    # ids/starts: IDs únicos (en minúsculas) ordenados y la posición de su primera fila en frame.
+    def __init__(self, frame):
+        keys = frame['Customer ID'].str.lower().to_numpy(dtype=str)
+        order = np.argsort(keys, kind='stable')
+        self.frame = frame.iloc[order].reset_index(drop=True)
+        self.ids, self.starts = np.unique(keys[order], return_index=True)
+        self.starts = np.append(self.starts, len(keys))
+
+    def search(self, query):
+        # Coincidencia parcial (como str.contains) sobre los IDs únicos; cada ID marca su bloque de filas en frame.
+        hits = np.char.find(self.ids, query.strip().lower()) >= 0
+        return self.frame[np.repeat(hits, np.diff(self.starts))]
+
+
+def bin_points(df_map, zoom=MAP_ZOOM, cell_px=CELL_PX):
+    # Rejilla cuadrada en pantalla: grados por píxel al zoom dado (lat corregida por Mercator).
+    lon, lat = df_map['Lon'].to_numpy(float), df_map['Lat'].to_numpy(float)
+    score = df_map['Score'].to_numpy(float)
+    size_lon = 360 / (256 * 2 ** zoom) * cell_px
+    size_lat = size_lon * np.cos(np.radians(np.nanmean(lat)))
+    ix, iy = np.floor(lon / size_lon).astype(np.int64), np.floor(lat / size_lat).astype(np.int64)
+    ix, iy = ix - ix.min(), iy - iy.min()
+    _, inv = np.unique(ix * (iy.max() + 1) + iy, return_inverse=True)
+    n = np.bincount(inv)
+    # Clientes distintos por celda (un cliente puede haber respondido varias veces).
+    codes = pd.factorize(df_map['Customer ID'])[0].astype(np.int64)
+    cell_customer = np.unique(inv.astype(np.int64) * (codes.max() + 1) + codes)
+    customers = np.bincount(cell_customer // (codes.max() + 1), minlength=len(n))
+    score_sum = np.bincount(inv, weights=score)
+    return pd.DataFrame({
+        'Lon': np.bincount(inv, weights=lon) / n,
+        'Lat': np.bincount(inv, weights=lat) / n,
+        'Clientes': customers,
+        'score_sum': score_sum,
+        'Score': score_sum / n,
+    })
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def build_geo_index(survey_version, coords_version, _survey, _coords):
+    perf.count('build:build_geo_index')
+    df_c = _coords.iloc[:, :3].copy()
+    df_c.columns = ['ID', 'Lon', 'Lat']
+    df_c['ID'] = normalize_ids(df_c['ID'])
+    df_c['Lat'] = pd.to_numeric(df_c['Lat'], errors='coerce')
+    df_c['Lon'] = pd.to_numeric(df_c['Lon'], errors='coerce')
+    df_c = df_c.dropna(subset=['Lat', 'Lon'])
+    cols = [c for c in MAP_COLS if c in _survey.columns and c not in ('Lon', 'Lat')]
+    df_s = _survey[cols].copy()
+    df_s['Customer ID'] = normalize_ids(df_s['Customer ID'])
+    df_map = pd.merge(df_s, df_c, left_on='Customer ID', right_on='ID', how='inner').drop(columns='ID')
+    return GeoIndex(df_map)
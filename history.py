@@ -0,0 +1,133 @@
+import hashlib
+import logging
+import os
+import re
+import pandas as pd
+import streamlit as st
+from pandas.api.types import union_categoricals
+import aggregates
+import evolution
+import perf
+import store
+
+log = logging.getLogger(__name__)
+
+# --- HISTORIAL MENSUAL PARTICIONADO (snapshots/history/month=YYYY-MM.feather) ---
+# Un export histórico (store.py ingest) reemplaza completas las particiones de los meses que trae; la hoja en vivo
+# se fusiona con lo guardado. Las consultas por rango solo abren los archivos de los meses pedidos.
+HISTORY_KEY = ['Customer ID', 'Survey Completed Date']
+_PART = re.compile(r'^month=(\d{4}-\d{2})\.feather$')
+
+
+def _dir():
+    return os.path.join(store.SNAPSHOT_DIR, 'history')
+
+
+def _path(month):
+    return os.path.join(_dir(), f"month={month}.feather")
+
+
+def partitions():
+    # {mes: mtime} de las particiones existentes, sin abrir ningún archivo.
+    try:
+        names = os.listdir(_dir())
+    except FileNotFoundError:
+        return {}
+    parts = {}
+    for name in names:
+        m = _PART.match(name)
+        if m:
+            parts[m.group(1)] = os.stat(os.path.join(_dir(), name)).st_mtime_ns
+    return dict(sorted(parts.items()))
+
+
+def months(start=None, end=None):
+    return [m for m in partitions() if (start is None or m >= start) and (end is None or m <= end)]
+
+
+def write_partitions(df, replace=False):
+    # df normalizado (columna Month de data.normalize_survey); las filas sin fecha no entran al historial.
+    # replace=True solo para la ingesta de un export; si no, cada mes se fusiona con su partición (_merge).
+    os.makedirs(_dir(), exist_ok=True)
+    written = []
+    for month, part in df[df['Month'] != 'N/A'].groupby('Month', observed=True, sort=True):
+        path = _path(month)
+        if not replace and os.path.exists(path):
+            part = _merge(store.read_frame(path), part)
+        store.write_frame(path, part)
+        written.append((month, len(part)))
+    return written
+
+
+def _merge(old, new):
+    # La hoja en vivo solo trae parte de un mes ya ingestado (o filas sueltas de meses pasados): se conservan las
+    # filas guardadas y las de la hoja reemplazan a las de la misma respuesta (Customer ID + fecha de encuesta; una
+    # respuesta ocupa una fila por driver).
+    key = [c for c in HISTORY_KEY if c in old.columns and c in new.columns]
+    if not key:
+        return _concat([old, new.reset_index(drop=True)]).drop_duplicates(keep='last', ignore_index=True)
+    old = old[~pd.MultiIndex.from_frame(old[key]).isin(pd.MultiIndex.from_frame(new[key]))]
+    return _concat([old, new.reset_index(drop=True)])
+
+
+def range_version(start, end):
+    # Cambia si se agrega, quita o reescribe alguna partición del rango.
+    parts = [(m, t) for m, t in partitions().items() if start <= m <= end]
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:12]
+
+
+def _concat(frames):
+    # pd.concat convierte a object las categóricas con categorías distintas: se unen con union_categoricals.
+    df = pd.concat(frames, ignore_index=True)
+    for col in frames[0].columns:
+        if all(col in f.columns and isinstance(f[col].dtype, pd.CategoricalDtype) for f in frames):
+            df[col] = union_categoricals([f[col] for f in frames], ignore_order=True)
+    return df
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def load_range(version, start, end):
+    perf.count('build:load_range')
+    frames = [store.read_frame(_path(m)) for m in months(start, end)]
+    if not frames:
+        return pd.DataFrame()
+    return frames[0] if len(frames) == 1 else _concat(frames)
+
+
+def period_filter(df, version, key):
+    # Selector de meses para vistas sobre la hoja actual. Con el rango por defecto (los meses de la hoja)
+    # se sigue usando la hoja en memoria; si no hay historial fuera de esos meses no se muestra el selector.
+    current = [m for m in df['Month'].cat.categories if m != 'N/A'] if 'Month' in df.columns else []
+    parts = partitions()
+    if set(current) - set(parts):
+        # Hoja restaurada de un snapshot previo al historial: sus meses se agregan una vez. Como en
+        # data.sync_history, si snapshots/ no se puede escribir la página sigue con la hoja en memoria.
+        try:
+            write_partitions(df)
+        except Exception as e:
+            log.warning("No se pudo actualizar el historial con la hoja actual: %s", e)
+        parts = partitions()
+    options = sorted(set(parts) | set(current))
+    if not options or options == current:
+        return df, version
+    default = (current[0], current[-1]) if current else (options[-1], options[-1])
+    start, end = st.select_slider("Periodo:", options=options, value=default, key=key)
+    if current and (start, end) == default:
+        return df, version
+    range_v = range_version(start, end)
+    with perf.timer('history', 'load'):
+        return load_range(range_v, start, end), f"hist-{range_v}"
+
+
+def monthly_evolution(version, raw):
+    # Hoja de evolución + historial: real, año anterior, YTD y detractores desde las respuestas crudas
+    # si el historial cubre esos meses; el BGT siempre es el de la hoja. Devuelve (evo, versión combinada).
+    evo = evolution.parse_evolution(version, raw)
+    year = evolution.sheet_year(evo)
+    if not year or not months(f"{year - 1}-01", f"{year}-12"):
+        return evo, version
+    start, end = f"{year - 1}-01", f"{year}-12"
+    range_v = range_version(start, end)
+    cube = aggregates.build_cube(f"hist-{range_v}", load_range(range_v, start, end))
+    version = f"{version}-{range_v}"
+    return evolution.from_history(version, evo, cube), version
@@ -0,0 +1,71 @@
+import numpy as np
+import streamlit as st
+import perf
+import shared_cache
+
+# --- MOTOR NPS: PROPORCIONES, NPS E INTERVALOS DE CONFIANZA POR SEGMENTO ---
+# Todo sale del cubo (aggregates.build_cube): conteos por categoría -> una sola pasada con bincount.
+SEGMENT = ['Primary Driver', 'Secondary Driver', 'REG_GROUP', 'Month']
+COUNTS = ['n', 'promoters', 'detractors']
+Z = 1.959964  # 95 %
+
+
+def wilson(k, n, z=Z):
+    # Intervalo de Wilson para una proporción k/n (vectorizado; n = 0 -> NaN).
+    k, n = np.asarray(k, float), np.asarray(n, float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = k / n
+        denom = 1 + z ** 2 / n
+        center = (p + z ** 2 / (2 * n)) / denom
+        half = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denom
+    return center - half, center + half
+
+
+def nps_interval(promoters, detractors, n, z=Z):
+    # Wald ajustado para NPS (Rocks 2016: +3/4 promotor, +3/4 detractor, +3/2 pasivo, o sea n + 3): con pocas
+    # respuestas el intervalo se abre en vez de colapsar a 0 como el Wald simple. En puntos NPS (-100..100).
+    n_adj = np.asarray(n, float) + 3
+    p, d = (np.asarray(promoters) + .75) / n_adj, (np.asarray(detractors) + .75) / n_adj
+    se = np.sqrt((p + d - (p - d) ** 2) / n_adj)
+    return np.clip(100 * (p - d - z * se), -100, 100), np.clip(100 * (p - d + z * se), -100, 100)
+
+
+def _stats(df):
+    n, p, d = (df[c].to_numpy(float) for c in COUNTS)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        df['promoter_share'], df['detractor_share'] = p / n, d / n
+        df['nps'] = 100 * (p - d) / n
+    df['promoter_lo'], df['promoter_hi'] = wilson(p, n)
+    df['detractor_lo'], df['detractor_hi'] = wilson(d, n)
+    df['nps_lo'], df['nps_hi'] = nps_interval(p, d, n)
+    return df
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def build_segments(version, _cube):
+    return shared_cache.frame(f"segments-{version}", lambda: _build_segments(_cube))
+
+
+def _build_segments(cube):
+    # Una fila por Primary x Secondary x región x mes. La base del NPS son las respuestas con categoría.
+    perf.count('build:build_segments')
+    cube = cube[cube['Category'].isin(['Promoter', 'Passive', 'Detractor'])]
+    groups = cube.groupby(SEGMENT, observed=True, sort=True)
+    codes, size = groups.ngroup().to_numpy(), groups.ngroups
+    n = cube['n'].to_numpy(float)
+    category = cube['Category'].to_numpy()
+    out = groups.size().index.to_frame(index=False)
+    out['n'] = np.bincount(codes, weights=n, minlength=size).astype(np.int64)
+    out['promoters'] = np.bincount(codes, weights=n * (category == 'Promoter'), minlength=size).astype(np.int64)
+    out['detractors'] = np.bincount(codes, weights=n * (category == 'Detractor'), minlength=size).astype(np.int64)
+    return _stats(out)
+
+
+def rollup(segments, by, filters=None):
+    # Re-agrega los conteos a cualquier subconjunto de SEGMENT y recalcula NPS e intervalos.
+    if filters:
+        mask = np.ones(len(segments), bool)
+        for col, value in filters.items():
+            mask &= segments[col].isin(value if isinstance(value, (list, tuple, set)) else [value]).to_numpy()
+        segments = segments[mask]
+    return _stats(segments.groupby(by, observed=True)[COUNTS].sum().reset_index())
@@ -0,0 +1,104 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+import streamlit as st
+
+# --- INSTRUMENTACIÓN (TIEMPOS POR SECCIÓN/ETAPA, CONTADORES, EVENTOS JSON) ---
+# Etapas: fetch (HTTP), parse (CSV -> DataFrame), aggregate (cubo/índice/parseo), figure (builder), plotly (envío al navegador), render (página o fragmento).
+# NPS_PERF_LOG=ruta escribe cada evento como una línea JSON; ?admin=1 muestra el panel.
+WINDOW = 200    # mediciones guardadas por (sección, etapa) para percentiles
+EVENTS = 2000   # eventos guardados para exportar desde el panel
+
+log = logging.getLogger('nps.perf')
+if os.environ.get('NPS_PERF_LOG'):
+    _handler = logging.FileHandler(os.environ['NPS_PERF_LOG'])
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    log.addHandler(_handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+_lock = threading.Lock()
+_timings = defaultdict(lambda: deque(maxlen=WINDOW))
+_counters = defaultdict(int)
+_events = deque(maxlen=EVENTS)
+
+
+def record(section, stage, seconds, **extra):
+    event = dict(ts=round(time.time(), 3), section=section, stage=stage, ms=round(seconds * 1000, 2), **extra)
+    with _lock:
+        _timings[(section, stage)].append(seconds)
+        _events.append(event)
+    if log.isEnabledFor(logging.INFO):
+        log.info(json.dumps(event, default=str))
+
+
+@contextmanager
+def timer(section, stage, **extra):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(section, stage, time.perf_counter() - start, **extra)
+
+
+def timed(section, stage='render'):
+    # Para fragmentos: @st.fragment encima de @perf.timed(...) mide cada re-ejecución parcial.
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(section, f"{stage}:{fn.__name__}"):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, n=1):
+    with _lock:
+        _counters[name] += n
+
+
+def plotly_chart(fig, **kwargs):
+    # st.plotly_chart serializa la figura a JSON: es el costo de "render" de cada gráfica.
+    with timer(st.session_state.get('page', '-'), 'plotly'):
+        return st.plotly_chart(fig, **kwargs)
+
+
+def summary():
+    import numpy as np
+    import pandas as pd  # solo para el panel: el home no carga pandas
+    with _lock:
+        items = [(k, np.array(v) * 1000) for k, v in _timings.items()]
+    rows = [(section, stage, len(ms), ms[-1], np.percentile(ms, 50), np.percentile(ms, 95), ms.max(), ms.sum())
+            for (section, stage), ms in items]
+    cols = ['section', 'stage', 'n', 'last_ms', 'p50_ms', 'p95_ms', 'max_ms', 'total_ms']
+    return pd.DataFrame(rows, columns=cols).sort_values('total_ms', ascending=False, ignore_index=True)
+
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+
+def export_jsonl():
+    with _lock:
+        events = list(_events)
+    return '\n'.join(json.dumps(e, default=str) for e in events) + '\n'
+
+
+def render_panel(caches=None):
+    # Panel oculto: solo con ?admin=1 en la URL.
+    if st.query_params.get('admin') != '1':
+        return
+    import pandas as pd
+    with st.expander("⚙ RENDIMIENTO", expanded=False):
+        st.dataframe(summary().round(1), use_container_width=True, hide_index=True)
+        stats = dict(counters())
+        for name, values in (caches or {}).items():
+            stats.update({f"{name}:{k}": v for k, v in values.items()})
+        st.dataframe(pd.DataFrame(sorted(stats.items()), columns=['contador', 'valor']), use_container_width=True, hide_index=True)
+        st.download_button("Exportar eventos (JSONL)", export_jsonl(), file_name="nps_perf.jsonl", mime="application/json")
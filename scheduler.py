@@ -0,0 +1,111 @@
+import datetime
+import logging
+import os
+import threading
+import aggregates
+import charts
+import comments
+import data
+import geo
+import history
+import nps_engine
+import perf
+
+log = logging.getLogger(__name__)
+
+# --- REFRESCO EN SEGUNDO PLANO + PRE-CALENTADO DE CACHÉS ---
+# Un hilo por proceso revisa las hojas cada TICK segundos y las descarga cuando pasó REFRESH_AT_TTL de su TTL,
+# o siempre a las horas de NPS_REFRESH_AT (p.ej. "08:30,14:00", antes de las reuniones). Con una versión nueva
+# se construyen cubo, índices y figuras por defecto y recién entonces se publica: nadie paga ese costo al abrir la página.
+# Con caché compartida (shared_cache.py) también adopta lo que descargó otra réplica. NPS_SCHEDULER=0 lo desactiva (app.py).
+# `python scheduler.py` corre el mismo ciclo como sidecar (mantiene snapshots e historial).
+TICK = int(os.environ.get('NPS_SCHEDULER_TICK', 30))
+REFRESH_AT_TTL = 0.5
+REFRESH_AT = [t.strip() for t in os.environ.get('NPS_REFRESH_AT', '').split(',') if t.strip()]
+DEFAULT_CATS = ('Detractor', 'Passive', 'Promoter')
+
+
+def _due(name, now, last_tick):
+    if data.needs_refresh(name, REFRESH_AT_TTL) or data.shared_changed(name):
+        return True
+    # Horas fijas: vence si la hora HH:MM cayó entre el tick anterior y este.
+    return any(last_tick < datetime.datetime.combine(now.date(), datetime.time.fromisoformat(t)) <= now for t in REFRESH_AT)
+
+
+def prewarm(frames):
+    # frames: {hoja: (DataFrame, versión)} ya descargadas pero aún sin publicar. Mismas claves que usan las vistas.
+    if 'current' in frames:
+        df, version = frames['current']
+        cube = aggregates.build_cube(version, df)
+        segments = nps_engine.build_segments(version, cube)
+        comments.build_comment_index(version, df)
+        for fig, args in [(charts.fig_primary_composition, ()), (charts.fig_primary_score, ()),
+                          (charts.fig_category_composition, ('All', DEFAULT_CATS)), (charts.fig_secondary_volume, ('All', DEFAULT_CATS)),
+                          (charts.fig_secondary_score, ('All', DEFAULT_CATS))]:
+            fig(version, *args, cube)
+        charts.fig_nps_ci(version, 'All', segments)
+        if 'coords' in frames:
+            df_coords, coords_version = frames['coords']
+            geo_idx = geo.build_geo_index(version, coords_version, df, df_coords)
+            charts.fig_heatmap((version, coords_version), 'All', DEFAULT_CATS, '', geo_idx)
+    if 'evolution' in frames:
+        raw, version = frames['evolution']
+        evo, evo_version = history.monthly_evolution(version, raw)
+        for site, block in evo['blocks'].items():
+            charts.fig_nps_line(evo_version, site, block)
+            charts.fig_nps_ytd(evo_version, site, block)
+        for det in evo['detractors'][:3]:
+            charts.fig_detractor_ring(evo_version, det['driver'], det['ytd'])
+
+
+def tick(names=None, force=False, last_tick=None):
+    now = datetime.datetime.now()
+    names = [n for n in (names or data.DATASETS) if force or _due(n, now, last_tick or now)]
+    fresh = {}
+    for name in names:
+        try:
+            with perf.timer('scheduler', 'fetch'):
+                fresh[name] = data.prepare(name, max_age=0 if force else TICK)
+        except Exception as e:
+            log.warning("Refresco en segundo plano de %s falló: %s", name, e)
+    changed = {n: e for n, e in fresh.items() if e is not data.published(n)}
+    if changed:
+        # Se pre-calcula sobre las versiones nuevas (y las publicadas para las hojas que no cambiaron).
+        # El historial se actualiza antes para que la evolución mensual pre-calculada ya lo incluya.
+        for name, entry in changed.items():
+            data.sync_history(name, entry)
+        frames = {n: (e.frame, e.version) for n in data.DATASETS if (e := changed.get(n) or data.published(n))}
+        try:
+            with perf.timer('scheduler', 'prewarm'):
+                prewarm(frames)
+        except Exception as e:
+            log.warning("Pre-calentado falló, se publica igual: %s", e)
+    for name, entry in fresh.items():
+        data.publish(name, entry, history_synced=True)
+    perf.count('scheduler:ticks')
+    return list(changed)
+
+
+def run(stop=None):
+    stop = stop or threading.Event()
+    last = datetime.datetime.now()
+    while not stop.wait(TICK):
+        try:
+            tick(last_tick=last)
+        except Exception as e:
+            log.warning("Tick del scheduler falló: %s", e)
+        last = datetime.datetime.now()
+
+
+def start():
+    # Lo llama app.py una sola vez por proceso (su st.cache_resource), desde otro hilo.
+    data.background = True
+    stop = threading.Event()
+    threading.Thread(target=run, args=(stop,), name='nps-scheduler', daemon=True).start()
+    return stop
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print("Hojas actualizadas:", tick(force=True) or "-")
+    run()
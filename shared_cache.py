@@ -0,0 +1,297 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+import pyarrow as pa
+import perf
+import store
+
+try:
+    import fcntl
+except ImportError:  # Windows: el backend en disco funciona sin bloqueo entre procesos
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+# --- CACHÉ COMPARTIDA ENTRE RÉPLICAS (HOJAS Y AGREGADOS, UNA VEZ POR VERSIÓN DE DATOS) ---
+# NPS_SHARED_CACHE elige el backend:
+#   (vacío)              local: cada proceso descarga y calcula lo suyo
+#   disk | disk:/ruta    Arrow IPC en disco leído con memory map + flock; réplicas en la misma máquina o volumen
+#   redis://host:6379/0  Redis o compatible (Valkey, KeyDB...); requiere el paquete `redis`
+# El manifiesto guarda por hoja la versión vigente, su ETag y la hora de la última revalidación: la réplica que
+# descarga lo actualiza y las demás adoptan esa versión desde la caché sin volver a pedirla a Google.
+KEEP = int(os.environ.get('NPS_SHARED_KEEP', 24 * 3600))  # segundos que se conserva un frame que nadie reescribió
+LOCK_TIMEOUT = 120  # Redis: una réplica caída no retiene el candado más que esto
+PRUNE_EVERY = 3600
+
+
+def sheet_key(name, version):
+    return f"{name}-{version}"
+
+
+def _encode(df):
+    table = store.to_table(df)
+    if len(df.columns) and all(isinstance(c, int) for c in df.columns):
+        # Hojas sin encabezado (evolución): columnas 0..N que Arrow guarda como texto.
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'nps_int_columns': b'1'})
+    return table
+
+
+def _decode(table):
+    df = table.to_pandas()
+    if (table.schema.metadata or {}).get(b'nps_int_columns'):
+        df.columns = [int(c) for c in df.columns]
+    return df
+
+
+class LocalBackend:
+    name = 'local'
+
+    def lock(self, name):
+        return nullcontext()
+
+    def get_meta(self, name):
+        return None
+
+    def put_meta(self, name, meta):
+        pass
+
+    def get_frame(self, key):
+        return None
+
+    def put_frame(self, key, df):
+        pass
+
+    def status(self):
+        return {}
+
+
+class DiskBackend:
+    name = 'disk'
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(self._path('frames'), exist_ok=True)
+        self._manifest, self._stamp, self._pruned_at = {}, None, 0
+
+    def _path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    @contextmanager
+    def lock(self, name):
+        # flock exclusivo por hoja (también entre hilos: cada open es una descripción distinta). El SO lo
+        # libera si el proceso muere, así que no hace falta timeout.
+        with open(self._path(f"{name}.lock"), 'a') as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_manifest(self):
+        # Se relee solo si el archivo cambió (os.replace cambia el inodo): un stat por consulta.
+        path = self._path('manifest.json')
+        try:
+            info = os.stat(path)
+        except FileNotFoundError:
+            return {}
+        stamp = (info.st_ino, info.st_mtime_ns)
+        if stamp != self._stamp:
+            with open(path) as f:
+                self._manifest = json.load(f)
+            self._stamp = stamp
+        return self._manifest
+
+    def get_meta(self, name):
+        return self._read_manifest().get(name)
+
+    def put_meta(self, name, meta):
+        with self.lock('manifest'):
+            manifest = dict(self._read_manifest(), **{name: meta})
+            tmp = self._path(f"manifest.json.{os.getpid()}.tmp")
+            with open(tmp, 'w') as f:
+                json.dump(manifest, f)
+            os.replace(tmp, self._path('manifest.json'))
+
+    def get_frame(self, key):
+        try:
+            return _decode(pa.ipc.open_file(pa.memory_map(self._path('frames', f"{key}.arrow"))).read_all())
+        except FileNotFoundError:
+            return None
+
+    def put_frame(self, key, df):
+        table = _encode(df)
+        path = self._path('frames', f"{key}.arrow")
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+        self._prune()
+
+    def _prune(self):
+        # Como mucho una vez por hora: se borran frames sin reescribir en KEEP segundos que el manifiesto ya no usa.
+        now = time.time()
+        if now - self._pruned_at < PRUNE_EVERY:
+            return
+        self._pruned_at = now
+        live = {f"{sheet_key(n, m['version'])}.arrow" for n, m in self._read_manifest().items()}
+        for entry in os.scandir(self._path('frames')):
+            if entry.name not in live and now - entry.stat().st_mtime > KEEP:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def status(self):
+        return self._read_manifest()
+
+
+class RedisBackend:
+    name = 'redis'
+
+    def __init__(self, url):
+        import redis  # dependencia opcional: solo con NPS_SHARED_CACHE=redis://...
+        self.errors = redis.exceptions.RedisError
+        self.client = redis.Redis.from_url(url)
+        self.prefix = os.environ.get('NPS_SHARED_PREFIX', 'nps:')
+
+    @contextmanager
+    def lock(self, name):
+        # Si Redis no responde o el candado no llega a tiempo, se sigue sin él: peor caso, una descarga repetida.
+        lock = self.client.lock(f"{self.prefix}lock:{name}", timeout=LOCK_TIMEOUT, blocking_timeout=LOCK_TIMEOUT)
+        try:
+            acquired = lock.acquire()
+        except self.errors as e:
+            log.warning("Sin candado compartido para %s: %s", name, e)
+            acquired = False
+        try:
+            yield
+        finally:
+            if acquired:
+                try:
+                    lock.release()
+                except self.errors:
+                    pass  # expiró durante una descarga larga
+
+    def get_meta(self, name):
+        raw = self.client.hget(f"{self.prefix}manifest", name)
+        return json.loads(raw) if raw else None
+
+    def put_meta(self, name, meta):
+        self.client.hset(f"{self.prefix}manifest", name, json.dumps(meta))
+
+    def get_frame(self, key):
+        raw = self.client.get(f"{self.prefix}frame:{key}")
+        return None if raw is None else _decode(pa.ipc.open_file(pa.py_buffer(raw)).read_all())
+
+    def put_frame(self, key, df):
+        table = _encode(df)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        self.client.set(f"{self.prefix}frame:{key}", sink.getvalue().to_pybytes(), ex=KEEP)
+
+    def status(self):
+        return {k.decode(): json.loads(v) for k, v in self.client.hgetall(f"{self.prefix}manifest").items()}
+
+
+# --- BACKEND ACTIVO (UNO POR PROCESO); SI FALLA SE SIGUE COMO SI FUERA LOCAL ---
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _create(spec):
+    try:
+        if spec.startswith(('redis://', 'rediss://', 'unix://')):
+            return RedisBackend(spec)
+        if spec == 'disk' or spec.startswith('disk:'):
+            return DiskBackend(spec[5:] or os.path.join(store.SNAPSHOT_DIR, 'shared'))
+    except Exception as e:
+        log.warning("No se pudo iniciar la caché compartida %r, se usa la local: %s", spec, e)
+    return LocalBackend()
+
+
+def backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = _create(os.environ.get('NPS_SHARED_CACHE', '').strip())
+        return _backend
+
+
+def enabled():
+    return not isinstance(backend(), LocalBackend)
+
+
+def _safe(action, fn, default=None):
+    try:
+        with perf.timer('shared', action):
+            return fn(backend())
+    except Exception as e:
+        log.warning("Caché compartida (%s) falló en %s: %s", backend().name, action, e)
+        return default
+
+
+def lock(name):
+    return backend().lock(name)
+
+
+def get_meta(name):
+    return _safe('meta', lambda b: b.get_meta(name))
+
+
+def put_meta(name, meta):
+    _safe('meta_save', lambda b: b.put_meta(name, meta))
+
+
+def get_frame(key):
+    return _safe('load', lambda b: b.get_frame(key))
+
+
+def put_frame(key, df):
+    _safe('save', lambda b: b.put_frame(key, df))
+
+
+def frame(key, build):
+    # Frame derivado (cubo, segmentos...) calculado una vez por versión entre todas las réplicas: quien no lo
+    # encuentra toma el candado del tipo ("cube", "segments") y vuelve a mirar antes de calcularlo.
+    if not enabled():
+        return build()
+    kind, hit = key.split('-')[0], True
+    df = get_frame(key)
+    if df is None:
+        with lock(kind):
+            df = get_frame(key)
+            if df is None:
+                hit, df = False, build()
+                put_frame(key, df)
+    perf.count(f"shared_{'hit' if hit else 'miss'}:{kind}")
+    return df
+
+
+def invalidate(*names):
+    # Todas las réplicas revalidan la hoja en su próxima consulta (la primera descarga, las demás adoptan).
+    for name in names:
+        with lock(name):
+            meta = get_meta(name)
+            if meta:
+                put_meta(name, dict(meta, invalidated_at=time.time()))
+
+
+if __name__ == "__main__":
+    # python shared_cache.py status | invalidate [hoja ...]
+    import data
+    if len(sys.argv) >= 2 and sys.argv[1] == "invalidate":
+        invalidate(*(sys.argv[2:] or data.DATASETS))
+    elif len(sys.argv) < 2 or sys.argv[1] != "status":
+        sys.exit("Uso: python shared_cache.py status | invalidate [hoja ...]")
+    print(f"Backend: {backend().name}")
+    for name, meta in backend().status().items():
+        age = time.time() - meta.get('checked_at', 0)
+        print(f"{name}: versión {meta['version']}, revalidada hace {age:.0f} s"
+              + (" (invalidada)" if meta.get('invalidated_at', 0) > meta.get('checked_at', 0) else ""))
@@ -0,0 +1,90 @@
+import json
+import os
+import sys
+import time
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# --- SNAPSHOTS LOCALES (FEATHER SIN COMPRIMIR -> SE PUEDEN LEER CON MEMORY MAP) ---
+SNAPSHOT_DIR = os.environ.get('NPS_SNAPSHOT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots'))
+
+
+def _paths(name):
+    return os.path.join(SNAPSHOT_DIR, f"{name}.feather"), os.path.join(SNAPSHOT_DIR, f"{name}.json")
+
+
+def _write_atomic(path, write):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _write_json(path, obj):
+    with open(path, 'w') as f:
+        json.dump(obj, f)
+
+
+def to_table(df):
+    df = df.reset_index(drop=True)
+    df.columns = [str(c) for c in df.columns]
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Columnas con tipos mezclados (p.ej. IDs numéricos y de texto): se guardan como texto.
+        obj = df.select_dtypes(include='object').columns
+        df[obj] = df[obj].astype('string')
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    return table
+
+
+def write_frame(path, df):
+    # Feather sin comprimir, escrito de forma atómica.
+    table = to_table(df)
+    _write_atomic(path, lambda p: feather.write_feather(table, p, compression='uncompressed'))
+
+
+def read_frame(path):
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+
+def save_snapshot(name, df, version, **meta):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    data_path, meta_path = _paths(name)
+    int_columns = all(isinstance(c, int) for c in df.columns)
+    write_frame(data_path, df)
+    meta.update(version=version, saved_at=time.time(), int_columns=int_columns, rows=len(df))
+    _write_atomic(meta_path, lambda p: _write_json(p, meta))
+
+
+def load_snapshot(name):
+    data_path, meta_path = _paths(name)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    df = read_frame(data_path)
+    if meta.get('int_columns'):
+        df.columns = [int(c) for c in df.columns]
+    return df, meta
+
+
+def ingest_excel(path, name=None):
+    # Convierte un export histórico (p.ej. "Base bruta dic.xlsx") al store y al historial mensual: openpyxl se usa una sola vez.
+    import history
+    from data import SCHEMA, normalize_survey
+    name = name or os.path.splitext(os.path.basename(path))[0].strip().lower().replace(' ', '_')
+    df = normalize_survey(pd.read_excel(path))
+    save_snapshot(name, df, f"xlsx-{int(os.path.getmtime(path))}", source=os.path.basename(path),
+                  schema=SCHEMA)
+    return name, len(df), history.write_partitions(df, replace=True)
+
+
+if __name__ == "__main__":
+    # python store.py ingest "Base bruta dic.xlsx"
+    if len(sys.argv) >= 3 and sys.argv[1] == "ingest":
+        for p in sys.argv[2:]:
+            name, rows, months = ingest_excel(p)
+            print("%s: %d filas; meses: %s" % (name, rows, ", ".join(f"{m} ({n})" for m, n in months) or "-"))
+    else:
+        print('Uso: python store.py ingest "Base bruta dic.xlsx" [...]')
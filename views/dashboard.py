@@ -0,0 +1,124 @@
+import streamlit as st
+import aggregates
+import assets
+import charts
+import comments
+import data
+import geo
+import history
+import nps_engine
+import perf
+
+
+# ==========================================
+# VISTA 2: DASHBOARD (FONDO NEGRO / CURRENT MONTH)
+# ==========================================
+def render():
+    st.markdown("""
+        <style>
+        .stApp { background-color: #000000; color: #FFFFFF; overflow: auto !important; }
+        div[data-testid="stButton"] button { background-color: #FFFF00 !important; color: #000000 !important; border: none !important; font-weight: bold !important; padding: 0.5rem 1rem !important; }
+        .banner-amarillo { background-color: #FFFF00; padding: 15px; display: flex; justify-content: space-between; align-items: center; border-radius: 5px; margin-top: 10px; margin-bottom: 25px; }
+        .titulo-texto { text-align: center; flex-grow: 1; color: #000000; font-family: 'Arial Black', sans-serif; }
+        .titulo-texto h1 { margin: 0; font-size: 50px; font-weight: 900; line-height: 1; }
+        .card-transparent { background-color: rgba(255, 255, 255, 0.02); border-radius: 15px; padding: 10px; margin-bottom: 20px; color: #FFFFFF; }
+        .emoji-solid-yellow { font-size: 110px; text-align: center; color: #FFFF00; text-shadow: 0 0 0 #FFFF00; line-height: 1; margin-bottom: 15px; display: block; }
+        label { color: #FFFF00 !important; font-weight: bold !important; }
+        .stTextInput input, .stTextArea textarea, .stNumberInput input { background-color: #1A1A1A !important; color: white !important; border: 1px solid #333 !important; }
+        </style>
+        """, unsafe_allow_html=True)
+
+    c_nav1, c_nav2 = st.columns([8, 1.2])
+    with c_nav1:
+        if st.button("⬅ VOLVER AL INICIO", key="back_btn"):
+            st.session_state.page = "home"
+            st.rerun()
+    with c_nav2:
+        if st.button("ACTUALIZAR", key="refresh_dash"):
+            data.refresh("current", "coords")
+            st.rerun()
+
+    df, df_coords = data.get_datasets("current", "coords")
+
+    url_logo2, url_logo = assets.asset_url('logo2.png'), assets.asset_url('logo.png')
+    if url_logo and url_logo2:
+        st.markdown(f'<div class="banner-amarillo"><img src="{url_logo2}" style="max-height:80px;"><div class="titulo-texto"><h1>NPS 2025</h1></div><img src="{url_logo}" style="max-height:80px;"></div>', unsafe_allow_html=True)
+
+    if not df.empty:
+        # Rango de meses: por defecto la hoja actual; meses anteriores salen del historial (history.py).
+        df, version = history.period_filter(df, data.dataset_version("current"), key="periodo_dash")
+        col_g1, col_g2 = st.columns(2)
+        with perf.timer('dashboard', 'aggregate'):
+            cube = aggregates.build_cube(version, df)
+            segments = nps_engine.build_segments(version, cube)
+        
+        with col_g1:
+            perf.plotly_chart(charts.fig_primary_composition(version, cube), use_container_width=True)
+        with col_g2:
+            perf.plotly_chart(charts.fig_primary_score(version, cube), use_container_width=True)
+
+        # Filtros, gráficas 3-5 y mapa se re-ejecutan solos; las gráficas 1 y 2 no se redibujan.
+        @st.fragment
+        @perf.timed('dashboard')
+        def render_filtros():
+            st.markdown("<hr style='border: 1px solid #333;'>", unsafe_allow_html=True)
+            c_f1, c_f2 = st.columns(2)
+            with c_f1: selector_driver = st.selectbox('Primary Driver:', ['All'] + sorted([d for d in cube['Primary Driver'].unique() if d != 'N/A']))
+            with c_f2: selector_cat = st.multiselect('Category:', sorted([cat for cat in cube['Category'].unique() if cat != 'N/A']), default=['Detractor', 'Passive', 'Promoter'])
+        
+            cats = tuple(sorted(selector_cat))
+
+            col_d1, col_d2 = st.columns([1, 2])
+            with col_d1:
+                fig3 = charts.fig_category_composition(version, selector_driver, cats, cube)
+                if fig3 is not None:
+                    perf.plotly_chart(fig3, use_container_width=True)
+            with col_d2:
+                fig4 = charts.fig_secondary_volume(version, selector_driver, cats, cube)
+                if fig4 is not None:
+                    perf.plotly_chart(fig4, use_container_width=True)
+
+            st.markdown("<br>", unsafe_allow_html=True)
+            fig5 = charts.fig_secondary_score(version, selector_driver, cats, cube)
+            if fig5 is not None:
+                perf.plotly_chart(fig5, use_container_width=True)
+
+            fig6 = charts.fig_nps_ci(version, selector_driver, segments)
+            if fig6 is not None:
+                perf.plotly_chart(fig6, use_container_width=True)
+
+            # --- BLOQUE EXCLUSIVO: MAPA DE CALOR CON BUSCADOR (el buscador solo re-ejecuta el mapa) ---
+            @st.fragment
+            @perf.timed('dashboard')
+            def render_mapa(selector_driver, cats):
+                st.markdown('<p style="color:#FFFF00; font-size:25px; font-weight:bold; margin-top:20px;">GEOGRAPHIC HEATMAP</p>', unsafe_allow_html=True)
+        
+                busqueda = st.text_input("Buscar por Código de Cliente:", placeholder="Escriba el ID para filtrar el mapa...")
+
+                if not df_coords.empty:
+                    with perf.timer('dashboard', 'aggregate'):
+                        geo_idx = geo.build_geo_index(version, data.dataset_version("coords"), df, df_coords)
+                    fig_map = charts.fig_heatmap((version, data.dataset_version("coords")), selector_driver, cats, busqueda.strip(), geo_idx)
+                    if fig_map is not None:
+                        perf.plotly_chart(fig_map, use_container_width=True)
+                    else:
+                        st.info("No se encontraron coordenadas para los clientes seleccionados o el ID buscado.")
+            render_mapa(selector_driver, cats)
+        render_filtros()
+
+        @st.fragment
+        @perf.timed('dashboard')
+        def render_comentarios():
+            st.markdown("<hr style='border: 1px solid #333;'>", unsafe_allow_html=True)
+            st.markdown('<p style="color:#FFFF00; font-size:35px; font-weight:bold; text-align:center;">CHOSEN COMMENTS</p>', unsafe_allow_html=True)
+            comments.render_search(df, version, key="buscar_dash")
+            col_t1, col_t2, col_t3 = st.columns(3)
+            def render_dynamic_card(col, key_id, default_title):
+                with col:
+                    st.markdown(f'<div class="card-transparent"><div class="emoji-solid-yellow">☹</div></div>', unsafe_allow_html=True)
+                    st.text_input("Secondary Driver:", value=default_title, key=f"title_{key_id}")
+                    st.text_input("Cliente:", key=f"client_{key_id}"); st.number_input("Score:", min_value=0, max_value=10, step=1, key=f"score_{key_id}")
+                    st.text_area("Comentario:", key=f"comment_{key_id}", height=120); st.text_input("Camión / Unidad:", key=f"truck_{key_id}")
+            render_dynamic_card(col_t1, "c1", "Secondary Driver 1:"); render_dynamic_card(col_t2, "c2", "Secondary Driver 2:"); render_dynamic_card(col_t3, "c3", "Secondary Driver 3:")
+        render_comentarios()
+    else: st.warning("Cargando datos...")
@@ -0,0 +1,122 @@
+import streamlit as st
+import aggregates
+import charts
+import comments
+import data
+import history
+import perf
+
+
+# ==========================================
+# VISTA 4: EA / LP (SOLUCIÓN DEFINITIVA - INTERACTIVA)
+# ==========================================
+def render():
+    st.markdown("""
+        <style>
+        .stApp { background-color: #000000 !important; }
+        div.stButton > button {
+            background-color: #FFFF00 !important;
+            color: black !important;
+            font-weight: bold !important;
+            border: 2px solid #FFFF00 !important;
+        }
+        .banner-ea-lp {
+            background-color: #FFFF00; padding: 10px; border-radius: 5px;
+            text-align: center; margin-bottom: 20px;
+        }
+        .stMultiSelect label { color: #FFFF00 !important; font-weight: bold; }
+        [data-testid="stDataFrame"] { margin-top: 20px; }
+        </style>
+        """, unsafe_allow_html=True)
+
+    c_nav1, c_nav2 = st.columns([8, 2])
+    with c_nav1:
+        if st.button("⬅ VOLVER AL INICIO", key="btn_v_home"):
+            st.session_state.page = "home"
+            st.rerun()
+    with c_nav2:
+        if st.button("ACTUALIZAR", key="btn_v_refresh"):
+            data.refresh("current")
+            st.rerun()
+
+    st.markdown('<div class="banner-ea-lp"><h2 style="color:black; margin:0; font-family:Arial Black; font-size:22px;">PERFORMANCE EA / LP</h2></div>', unsafe_allow_html=True)
+
+    df_raw = data.get_dataset("current")
+
+    if not df_raw.empty:
+        col_comment = comments.comment_column(df_raw)
+
+        if 'Primary Driver' in df_raw.columns:
+            df_raw, version = history.period_filter(df_raw, data.dataset_version("current"), key="periodo_ea_lp")
+            with perf.timer('ea_lp', 'aggregate'):
+                cube = aggregates.build_cube(version, df_raw)
+            cube_delivery = aggregates.delivery(cube)
+            
+            st.markdown("<br>", unsafe_allow_html=True)
+            cat_options = sorted([c for c in cube_delivery['Category'].unique() if str(c) not in ['nan', 'N/A']])
+            selected_cats = st.multiselect("Filtrar por Categoría:", options=cat_options, default=cat_options)
+            
+            df_final = aggregates.slice_cube(cube_delivery, {'REG_GROUP': ['EA', 'LP'], 'Category': selected_cats})
+            cats = tuple(sorted(selected_cats))
+
+            if not df_final.empty:
+                # Click en una barra: solo se re-ejecuta este bloque (distribución, drivers y DETALLES), no el SCORE GAP.
+                @st.fragment
+                @perf.timed('ea_lp')
+                def render_drill_down():
+                    col_izq, col_der = st.columns([1.5, 2.5])
+                    with col_izq:
+                        st.markdown('<p style="color:#FFFF00; font-size:18px; font-weight:bold; text-align:center; margin-bottom:10px;">CUSTOMER DISTRIBUTION</p>', unsafe_allow_html=True)
+                        perf.plotly_chart(charts.fig_region_distribution(version, cats, df_final), use_container_width=True)
+                    
+                    with col_der:
+                        st.markdown('<p style="color:#FFFF00; font-size:18px; font-weight:bold; text-align:center; margin-bottom:10px;">DRIVERS BY REGION</p>', unsafe_allow_html=True)
+                    
+                        fig_horiz = charts.fig_drivers_by_region(version, cats, df_final)
+                        event = perf.plotly_chart(
+                            fig_horiz, 
+                            use_container_width=True, 
+                            key="chart_interactive", 
+                            on_select="rerun",
+                            selection_mode="points"
+                        )
+
+                    if event and event.selection.points:
+                        st.markdown("<br>", unsafe_allow_html=True)
+                        selected_drivers = [p['customdata'][0] for p in event.selection.points]
+                        selected_regions = [p['customdata'][1] for p in event.selection.points]
+                    
+                        if selected_drivers:
+                            driver_name = selected_drivers[0]
+                            st.markdown(f'<p style="color:#FFFF00; font-size:20px; font-weight:bold;">DETALLES: {driver_name}</p>', unsafe_allow_html=True)
+                            df_details = df_raw[
+                                (df_raw['Secondary Driver'].isin(selected_drivers)) & 
+                                (df_raw['Category'].isin(selected_cats)) & 
+                                (df_raw['DRIVER_UP'] == 'DELIVERY') &
+                                (df_raw['REG_GROUP'].isin(selected_regions))
+                            ]
+                            cols_display = ['Customer ID', 'Score', 'Category', 'Secondary Driver']
+                            if col_comment: cols_display.append(col_comment)
+                            st.dataframe(df_details[cols_display], use_container_width=True, hide_index=True)
+                            st.markdown("<hr style='border: 1px solid #333;'>", unsafe_allow_html=True)
+                render_drill_down()
+
+                st.markdown("<br>", unsafe_allow_html=True)
+                st.markdown('<p style="color:#FFFF00; font-size:18px; font-weight:bold; text-align:center;">SCORE GAP ANALYSIS</p>', unsafe_allow_html=True)
+                if 'Score' in df_raw.columns:
+                    perf.plotly_chart(charts.fig_score_gap(version, cats, df_final), use_container_width=True, config={'displayModeBar': False})
+                else:
+                    st.warning("No se encontró la columna de Score en el archivo.")
+            else:
+                st.warning("No hay datos para los filtros seleccionados.")
+
+            # Buscador sobre todos los comentarios del periodo (por defecto: Delivery en EA y LP).
+            @st.fragment
+            @perf.timed('ea_lp')
+            def render_busqueda():
+                st.markdown('<p style="color:#FFFF00; font-size:18px; font-weight:bold; text-align:center;">COMMENT SEARCH</p>', unsafe_allow_html=True)
+                delivery = list(cube_delivery['Primary Driver'].unique())
+                comments.render_search(df_raw, version, key="buscar_ea_lp", defaults={'Primary Driver': delivery, 'REG_GROUP': ['EA', 'LP']})
+            render_busqueda()
+        else:
+            st.error("No se encontró la columna 'Primary Driver'.")
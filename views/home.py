@@ -0,0 +1,65 @@
+import streamlit as st
+import assets
+
+
+# ==========================================
+# VISTA 1: HOME (FONDO LOGO3.PNG)
+# ==========================================
+def render():
+    bg_url = assets.asset_url('logo3.png')
+    style_home = f'''
+    <style>
+    .stApp {{
+        background-image: url("{bg_url if bg_url else ""}");
+        background-size: cover;
+        background-position: center;
+        background-repeat: no-repeat;
+        overflow: hidden; 
+        height: 100vh;
+        width: 100vw;
+    }}
+    header {{visibility: hidden;}}
+    .block-container {{padding: 0 !important;}}
+    .main-title {{
+        position: fixed;
+        top: 50%; left: 50%;
+        transform: translate(-50%, -50%);
+        color: white; font-size: 4rem; font-weight: 800;
+        text-align: center; width: 100%;
+        text-shadow: 4px 4px 15px rgba(0,0,0,0.8);
+        z-index: 1000; letter-spacing: 2px;
+    }}
+    .stHorizontalBlock {{
+        position: fixed;
+        bottom: 10%; left: 50%;
+        transform: translateX(-50%);
+        width: 50% !important;
+        z-index: 1001;
+    }}
+    div.stButton > button {{
+        background-color: #FFFF00 !important;
+        color: black !important;
+        font-weight: bold !important;
+        font-size: 18px !important;
+        border: none !important;
+        padding: 15px 30px !important;
+        border-radius: 10px !important;
+        box-shadow: 0px 4px 15px rgba(0,0,0,0.4);
+    }}
+    </style>
+    '''
+    st.markdown(style_home, unsafe_allow_html=True)
+    st.markdown('<div class="main-title">NET PROMOTER SCORE PERFORMANCE</div>', unsafe_allow_html=True)
+    col1, col2, col3 = st.columns(3) # Cambiamos de 2 a 3 columnas
+    with col1:
+        if st.button("MONTHLY EVOLUTION", use_container_width=True):
+            st.session_state.page = "monthly"
+            st.rerun()
+    with col2:
+        if st.button("CURRENT MONTH", use_container_width=True):
+            st.session_state.page = "dashboard"
+            st.rerun()
+    with col3:
+        if st.button("EA / LP", use_container_width=True): # Nuevo Botón
+            st.session_state.page = "ea_lp"
+            st.rerun()   
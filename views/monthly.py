@@ -0,0 +1,108 @@
+import streamlit as st
+import assets
+import charts
+import data
+import evolution
+import history
+import perf
+
+
+# ==========================================
+# VISTA 3: MONTHLY EVOLUTION
+# ==========================================
+def render():
+    st.markdown("""
+        <style>
+        .stApp { background-color: black; color: white; }
+        .header-banner { background-color: #FFFF00; padding: 10px 30px; display: flex; justify-content: space-between; align-items: center; border-radius: 5px; margin-bottom: 10px; }
+        .header-title { color: black !important; font-family: 'Arial Black', sans-serif; font-size: 28px; margin: 0; text-align: center; flex-grow: 1; }
+        .section-banner { background-color: #FFFF00; color: black !important; padding: 4px 10px; border-radius: 5px; text-align: center; margin-top: 15px; margin-bottom: 15px; font-weight: bold; }
+        .logo-img { height: 70px; }
+        div.stButton > button { background-color: #FFFF00; color: black; border: None; font-weight: bold; }
+        .stTextArea label {
+            color: #FFFF00 !important;
+            font-size: 22px !important; 
+            font-weight: bold !important;
+            border: 2px solid #FFFF00; 
+            padding: 5px 10px;
+            border-radius: 5px;
+            display: inline-block;
+            margin-bottom: 10px;
+        }
+        .detractores-table { width: 100%; border-collapse: collapse; color: black; background-color: white; margin-bottom: 20px; }
+        .detractores-table th { background-color: #1a3a4a; color: white; padding: 10px; border: 1px solid #ddd; font-size: 12px; }
+        .detractores-table td { padding: 8px; border: 1px solid #ddd; text-align: center; font-size: 12px; color: black; }
+        .detractores-table .text-col { text-align: left; background-color: #f9f9f9; width: 25%; font-weight: bold; }
+        </style>
+        """, unsafe_allow_html=True)
+
+    c_nav_m1, c_nav_m2 = st.columns([8, 1.2])
+    with c_nav_m1:
+        if st.button("⬅ VOLVER AL INICIO", key="back_btn_m"):
+            st.session_state.page = "home"
+            st.rerun()
+    with c_nav_m2:
+        if st.button("ACTUALIZAR", key="refresh_m"):
+            data.refresh("evolution")
+            st.rerun()
+
+    img_logo_izq, img_logo_der = assets.asset_url('logo2.png'), assets.asset_url('logo.png')
+    st.markdown(f"""
+        <div class="header-banner">
+            <img src="{img_logo_izq if img_logo_izq else ""}" class="logo-img">
+            <h1 class="header-title">MONTHLY EVOLUTION</h1>
+            <img src="{img_logo_der if img_logo_der else ""}" class="logo-img">
+        </div>
+        """, unsafe_allow_html=True)
+
+    df_raw_evo = data.get_dataset("evolution")
+
+    if not df_raw_evo.empty:
+        evo_version = data.dataset_version("evolution")
+        with perf.timer('monthly', 'aggregate'):
+            evo, evo_version = history.monthly_evolution(evo_version, df_raw_evo)
+
+        def render_nps_block(sitio, block):
+            # Título compacto para PPT (el mismo de las diapositivas de export.py)
+            st.markdown(f"""<div class="section-banner" style="margin-top: 5px; margin-bottom: 5px; padding: 2px;">
+                        <h2 style='color: black; margin: 0; font-size: 17px;'>
+                        {evolution.block_title(sitio, block)}</h2></div>""", unsafe_allow_html=True)
+            
+            col_a, col_b = st.columns([3, 1.2])
+            with col_a:
+                perf.plotly_chart(charts.fig_nps_line(evo_version, sitio, block), use_container_width=True, config={'displayModeBar': False})
+            with col_b:
+                perf.plotly_chart(charts.fig_nps_ytd(evo_version, sitio, block), use_container_width=True, config={'displayModeBar': False})
+
+        # --- ORDEN DEFINITIVO INTERCAMBIADO (evolution.SITE_ORDER; sitios nuevos se agregan al final) ---
+        for sitio in evolution.ordered_sites(evo['blocks']):
+            render_nps_block(sitio, evo['blocks'][sitio])
+        if evo.get('history_months'):
+            st.caption(f"Real y año anterior calculados desde el historial ({evo['history_months'][0]} a {evo['history_months'][-1]}); BGT de la hoja.")
+        
+        st.markdown('<div class="section-banner">DETRACTORS</div>', unsafe_allow_html=True)
+        table_html = '<table class="detractores-table"><thead><tr><th>Secondary Driver</th>'
+        for m in evolution.MESES: table_html += f'<th>{m}</th>'
+        table_html += '</tr></thead><tbody>'
+        for det in evo['detractors']:
+            table_html += f'<tr><td class="text-col">{det["driver"]}</td>'
+            for v in det['months']: table_html += f'<td>{v if v is not None else "-"}</td>'
+            table_html += '</tr>'
+        st.markdown(table_html + '</tbody></table>', unsafe_allow_html=True)
+        
+        top_det = evo['detractors'][:3]
+        for det, col in zip(top_det, st.columns(3)):
+            with col:
+                perf.plotly_chart(charts.fig_detractor_ring(evo_version, det['driver'], det['ytd']), use_container_width=True)
+        
+        st.markdown("---")
+
+        # Editar las notas solo re-ejecuta este fragmento: ni descarga ni redibuja las gráficas.
+        @st.fragment
+        @perf.timed('monthly')
+        def render_notas():
+            c1, c2, c3 = st.columns([1, 2, 1])
+            with c1: st.text_area("Causas Raíz YTD", height=150, value="Top 5:\n• Equipos de Frío\n• Servicio Entrega\n• Bees App", key="c1_m")
+            with c2: st.text_area("Plan de Acción", height=150, value="• Recapacitación atención cliente.\n• Refuerzo Operadores Logísticos.", key="c2_m")
+            with c3: st.text_area("Key KPIs", height=150, value="• Canjes\n• Rechazo\n• On time", key="c3_m")
+        render_notas()